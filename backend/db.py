@@ -1,4 +1,8 @@
+import queue
 import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -13,25 +17,209 @@ REQUIRED_TABLES = {
     "data_source_state",
     "admin_user",
 }
+# synchronous=NORMAL under WAL only risks the last commits on power loss (never corruption)
+# and avoids an fsync per transaction, which dominates the bulk import jobs.
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 10000",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA wal_autocheckpoint = 1000",
+)
+CONNECTION_PRAGMA_SCRIPT = ";\n".join(CONNECTION_PRAGMAS) + ";"
+READ_CONNECTION_PRAGMA_SCRIPT = """
+    PRAGMA busy_timeout = 10000;
+    PRAGMA query_only = 1;
+    PRAGMA cache_size = -65536;
+    PRAGMA mmap_size = 268435456;
+"""
+# Bump whenever schema_sql changes so warm starts re-run it.
+SCHEMA_VERSION = 5
+READ_POOL_SIZE = 4
+# Nothing reads the osm_* tables through an index any more (the API server loads them into KD-trees),
+# so the original type indexes only slowed down imports.
+DROPPED_OSM_SCHEMA_SQL = """
+    DROP INDEX IF EXISTS idx_osm_poi_type;
+    DROP INDEX IF EXISTS idx_osm_zone_type;
+"""
+
+# LIFO so the most recently used connection (with the warmest page cache) is reused first.
+_read_pool: queue.LifoQueue = queue.LifoQueue()
+_read_pool_lock = threading.Lock()
+_read_pool_opened = 0
+_read_conn_held = threading.local()
+_thread_conn = threading.local()
+_pragma_script: str | None = None
+
+
+class StaySenseConnection(sqlite3.Connection):
+    """sqlite3 connection that returns Row objects, so openers need no per-connection setup for it."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.row_factory = sqlite3.Row
+
+
+def _apply_connection_pragmas(conn: sqlite3.Connection) -> None:
+    global _pragma_script
+    if _pragma_script is not None:
+        if _pragma_script:
+            conn.executescript(_pragma_script)
+        return
+    # Decided once per process: read-only db mounts may reject some pragmas, keep only the accepted ones.
+    try:
+        conn.executescript(CONNECTION_PRAGMA_SCRIPT)
+        _pragma_script = CONNECTION_PRAGMA_SCRIPT
+    except sqlite3.OperationalError:
+        accepted = []
+        for pragma in CONNECTION_PRAGMAS:
+            try:
+                conn.execute(pragma)
+            except sqlite3.OperationalError:
+                continue
+            accepted.append(pragma)
+        _pragma_script = ";\n".join(accepted) + ";" if accepted else ""
 
 
 def get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, timeout=10)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.execute("PRAGMA busy_timeout = 10000")
+    conn = sqlite3.connect(DB_PATH, timeout=10, factory=StaySenseConnection)
+    _apply_connection_pragmas(conn)
     return conn
 
 
+def get_thread_conn() -> sqlite3.Connection:
+    """The calling thread's own read-write connection, opened on first use and kept for the thread's life.
+
+    Meant for the API server's long-lived worker threads: use it as `with get_thread_conn() as conn:`
+    (commit/rollback only) and never close it.
+    """
+    conn = getattr(_thread_conn, "conn", None)
+    if conn is None:
+        conn = _thread_conn.conn = get_conn()
+    return conn
+
+
+def _open_read_conn() -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        f"{DB_PATH.as_uri()}?mode=ro", uri=True, timeout=10, check_same_thread=False, factory=StaySenseConnection
+    )
+    conn.executescript(READ_CONNECTION_PRAGMA_SCRIPT)
+    return conn
+
+
+@contextmanager
+def get_read_conn() -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled read-only connection; writers keep using get_conn().
+
+    Nested borrows on the same thread get the connection already held, so a request wrapped in one
+    get_read_conn() block does all of its reads on a single connection (and cannot deadlock the pool).
+    """
+    global _read_pool_opened
+    held = getattr(_read_conn_held, "conn", None)
+    if held is not None:
+        yield held
+        return
+    try:
+        conn = _read_pool.get_nowait()
+    except queue.Empty:
+        with _read_pool_lock:
+            may_open = _read_pool_opened < READ_POOL_SIZE
+            if may_open:
+                _read_pool_opened += 1
+        if may_open:
+            try:
+                conn = _open_read_conn()
+            except Exception:
+                with _read_pool_lock:
+                    _read_pool_opened -= 1
+                raise
+        else:
+            conn = _read_pool.get()
+    _read_conn_held.conn = conn
+    try:
+        yield conn
+    finally:
+        _read_conn_held.conn = None
+        if conn.in_transaction:
+            conn.rollback()
+        _read_pool.put(conn)
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection | None = None) -> Iterator[sqlite3.Connection]:
+    # BEGIN IMMEDIATE takes the write lock up front, so the whole block commits with a single sync.
+    # A caller-supplied connection is reused and left open; otherwise one is opened for the block.
+    if conn is not None and conn.in_transaction:
+        # Nested inside an open transaction: a savepoint lets this block fail on its own while the
+        # outer transaction keeps everything else and still commits once.
+        conn.execute("SAVEPOINT nested_write")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK TO nested_write")
+            conn.execute("RELEASE nested_write")
+            raise
+        conn.execute("RELEASE nested_write")
+        return
+
+    owned = conn is None
+    if conn is None:
+        conn = get_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        if owned:
+            conn.close()
+
+
+def checkpoint_wal(conn: sqlite3.Connection | None = None) -> None:
+    """Fold the WAL back into the database file after a bulk import and truncate it."""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.OperationalError:
+        # Read-only mounts or non-WAL journals have nothing to checkpoint.
+        pass
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def _schema_version(conn: sqlite3.Connection) -> int | None:
+    try:
+        row = conn.execute("SELECT version FROM schema_meta WHERE id = 1").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return int(row["version"]) if row else None
+
+
 def init_db() -> None:
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     with get_conn() as conn:
+        if _schema_version(conn) == SCHEMA_VERSION:
+            return
+        # Only takes effect on a fresh database file, i.e. before the first table exists.
+        conn.execute("PRAGMA page_size = 8192")
         try:
             conn.execute("PRAGMA journal_mode = WAL")
         except sqlite3.OperationalError:
             # Some deployments run with read-only db mounts; continue without WAL.
             pass
         schema_sql = """
+            CREATE TABLE IF NOT EXISTS schema_meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL
+            );
+
             CREATE TABLE IF NOT EXISTS spot (
                 id TEXT PRIMARY KEY,
                 lat REAL NOT NULL,
@@ -122,8 +310,20 @@ def init_db() -> None:
                 updated_at TEXT NOT NULL
             );
 
-            CREATE INDEX IF NOT EXISTS idx_signal_spot_timestamp
-              ON community_signal (spot_id, timestamp);
+            CREATE TABLE IF NOT EXISTS admin_session (
+                token_hash TEXT PRIMARY KEY,
+                username TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                expires_at TEXT NOT NULL
+            );
+
+            -- Covering for the score lookup; the cooldown check seeks (spot, device) and reads the newest row.
+            DROP INDEX IF EXISTS idx_signal_spot_timestamp;
+            CREATE INDEX IF NOT EXISTS idx_signal_spot_timestamp_type
+              ON community_signal (spot_id, timestamp, signal_type);
+
+            CREATE INDEX IF NOT EXISTS idx_signal_spot_device_timestamp
+              ON community_signal (spot_id, hashed_device, timestamp);
 
             CREATE UNIQUE INDEX IF NOT EXISTS ux_signal_spot_device_day
               ON community_signal (spot_id, hashed_device, day_bucket);
@@ -131,20 +331,21 @@ def init_db() -> None:
             CREATE INDEX IF NOT EXISTS idx_local_event_spot_window
               ON local_event (spot_id, start_datetime, end_datetime);
 
-            CREATE INDEX IF NOT EXISTS idx_osm_poi_type
-              ON osm_poi (poi_type);
-
-            CREATE INDEX IF NOT EXISTS idx_osm_zone_type
-              ON osm_zone (zone_type);
-
             CREATE INDEX IF NOT EXISTS idx_open_data_event_window
               ON open_data_event (start_datetime, end_datetime);
 
             CREATE INDEX IF NOT EXISTS idx_open_data_event_source
               ON open_data_event (source);
-            """
+            """ + DROPPED_OSM_SCHEMA_SQL
         try:
             conn.executescript(schema_sql)
+            conn.execute(
+                """
+                INSERT INTO schema_meta (id, version) VALUES (1, ?)
+                ON CONFLICT(id) DO UPDATE SET version = excluded.version
+                """,
+                (SCHEMA_VERSION,),
+            )
         except sqlite3.OperationalError as exc:
             if "readonly" not in str(exc).lower():
                 raise
@@ -3,38 +3,51 @@ import csv
 import json
 from pathlib import Path
 
+from db import checkpoint_wal, init_db
 from open_data_connector import import_event_rows
 
 
 def import_events(csv_path: Path) -> dict:
-    rows = []
+    # Legacy CSV import keeps source-name bound to filename.
+    source_name = f"open_data_events:{csv_path.name}"
     with csv_path.open("r", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
+        reader = csv.reader(handle)
+        header = next(reader, [])
         required = {"lat", "lon", "event_type", "start_datetime", "end_datetime", "risk_modifier"}
-        if not required.issubset(set(reader.fieldnames or [])):
+        if not required.issubset(set(header)):
             raise ValueError(f"CSV missing required columns: {sorted(required)}")
 
+        idx_event_type = header.index("event_type")
+        idx_lat = header.index("lat")
+        idx_lon = header.index("lon")
+        idx_start = header.index("start_datetime")
+        idx_end = header.index("end_datetime")
+        idx_risk = header.index("risk_modifier")
+        min_len = max(idx_event_type, idx_lat, idx_lon, idx_start, idx_end, idx_risk) + 1
+
+        rows = []
+        idx = 0
         for line in reader:
+            if not line:
+                continue
+            if len(line) < min_len:
+                line = line + [""] * (min_len - len(line))
             rows.append(
                 {
-                    "id": None,
-                    "event_type": (line.get("event_type") or "").strip(),
-                    "lat": (line.get("lat") or "").strip(),
-                    "lon": (line.get("lon") or "").strip(),
-                    "start_datetime": (line.get("start_datetime") or "").strip(),
-                    "end_datetime": (line.get("end_datetime") or "").strip(),
-                    "risk_modifier": (line.get("risk_modifier") or "0").strip(),
+                    "id": f"{source_name}:{idx}",
+                    "event_type": line[idx_event_type].strip(),
+                    "lat": line[idx_lat].strip(),
+                    "lon": line[idx_lon].strip(),
+                    "start_datetime": line[idx_start].strip(),
+                    "end_datetime": line[idx_end].strip(),
+                    "risk_modifier": line[idx_risk].strip() or "0",
                 }
             )
+            idx += 1
 
-    # Legacy CSV import keeps source-name bound to filename.
-    source_name = f"open_data_events:{csv_path.name}"
-    normalized = []
-    for idx, row in enumerate(rows):
-        row["id"] = f"{source_name}:{idx}"
-        normalized.append(row)
-
-    result = import_event_rows(normalized, source_name=source_name, notes=str(csv_path))
+    init_db()
+    result = import_event_rows(rows, source_name=source_name, notes=str(csv_path))
+    checkpoint_wal()
     result["source"] = str(csv_path)
     return result
 
@@ -1,13 +1,69 @@
 import argparse
+import codecs
 import datetime as dt
+import gzip
+import itertools
 import json
-import uuid
+import re
+from collections.abc import Iterator
+from typing import BinaryIO
 from urllib import parse, request
 
-from db import get_conn, init_db
+from db import checkpoint_wal, get_conn, init_db, write_transaction
 
 OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 DEFAULT_BBOX = (51.16, 6.79, 51.38, 7.15)  # Kreis Mettmann approx: s,w,n,e
+STREAM_CHUNK_BYTES = 1 << 16
+INSERT_CHUNK_ROWS = 5000
+SOURCE_NAME = "osm_overpass"
+
+# The download is parsed into these TEMP tables first; only applying them takes the database write lock.
+CREATE_STAGE_SQL = """
+    CREATE TEMP TABLE osm_poi_stage (id TEXT PRIMARY KEY, poi_type TEXT, lat REAL, lon REAL);
+    CREATE TEMP TABLE osm_zone_stage (id TEXT PRIMARY KEY, zone_type TEXT, lat REAL, lon REAL);
+    CREATE TEMP TABLE osm_road_stage (id TEXT PRIMARY KEY, road_type TEXT, lat REAL, lon REAL);
+"""
+STAGE_POI_SQL = "INSERT OR REPLACE INTO temp.osm_poi_stage (id, poi_type, lat, lon) VALUES (?, ?, ?, ?)"
+STAGE_ZONE_SQL = "INSERT OR REPLACE INTO temp.osm_zone_stage (id, zone_type, lat, lon) VALUES (?, ?, ?, ?)"
+STAGE_ROAD_SQL = "INSERT OR REPLACE INTO temp.osm_road_stage (id, road_type, lat, lon) VALUES (?, ?, ?, ?)"
+# "WHERE true" keeps SQLite from reading ON CONFLICT as a join constraint of the SELECT.
+UPSERT_POI_SQL = """
+    INSERT INTO osm_poi (id, poi_type, lat, lon, source, imported_at)
+    SELECT id, poi_type, lat, lon, ?1, ?2 FROM temp.osm_poi_stage WHERE true
+    ON CONFLICT(id) DO UPDATE SET
+      poi_type = excluded.poi_type, lat = excluded.lat, lon = excluded.lon,
+      source = excluded.source, imported_at = excluded.imported_at
+    WHERE (poi_type, lat, lon, source) IS NOT (excluded.poi_type, excluded.lat, excluded.lon, excluded.source)
+"""
+UPSERT_ZONE_SQL = """
+    INSERT INTO osm_zone (id, zone_type, lat, lon, source, imported_at)
+    SELECT id, zone_type, lat, lon, ?1, ?2 FROM temp.osm_zone_stage WHERE true
+    ON CONFLICT(id) DO UPDATE SET
+      zone_type = excluded.zone_type, lat = excluded.lat, lon = excluded.lon,
+      source = excluded.source, imported_at = excluded.imported_at
+    WHERE (zone_type, lat, lon, source) IS NOT (excluded.zone_type, excluded.lat, excluded.lon, excluded.source)
+"""
+UPSERT_ROAD_SQL = """
+    INSERT INTO osm_road (id, road_type, lat, lon, source, imported_at)
+    SELECT id, road_type, lat, lon, ?1, ?2 FROM temp.osm_road_stage WHERE true
+    ON CONFLICT(id) DO UPDATE SET
+      road_type = excluded.road_type, lat = excluded.lat, lon = excluded.lon,
+      source = excluded.source, imported_at = excluded.imported_at
+    WHERE (road_type, lat, lon, source) IS NOT (excluded.road_type, excluded.lat, excluded.lon, excluded.source)
+"""
+# Unchanged rows are left alone (imported_at keeps the run that last changed them), so staleness is
+# decided by the ids this run has staged.
+DELETE_STALE_POI_SQL = "DELETE FROM osm_poi WHERE source = ? AND id NOT IN (SELECT id FROM temp.osm_poi_stage)"
+DELETE_STALE_ZONE_SQL = "DELETE FROM osm_zone WHERE source = ? AND id NOT IN (SELECT id FROM temp.osm_zone_stage)"
+DELETE_STALE_ROAD_SQL = "DELETE FROM osm_road WHERE source = ? AND id NOT IN (SELECT id FROM temp.osm_road_stage)"
+UPSERT_SOURCE_STATE_SQL = """
+    INSERT INTO data_source_state (source_name, imported_at, record_count, notes)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(source_name) DO UPDATE SET
+      imported_at = excluded.imported_at,
+      record_count = excluded.record_count,
+      notes = excluded.notes
+"""
 
 
 def now_iso() -> str:
@@ -67,130 +123,172 @@ def element_coords(element: dict) -> tuple[float, float] | None:
     return None
 
 
-def map_poi(tags: dict) -> str | None:
-    amenity = tags.get("amenity")
-    if amenity == "police":
-        return "police"
-    if amenity == "fire_station":
-        return "fire"
-    if amenity == "hospital":
-        return "hospital"
-    return None
-
-
-def map_zone(tags: dict) -> str | None:
-    landuse = tags.get("landuse")
-    amenity = tags.get("amenity")
-    natural = tags.get("natural")
-    leisure = tags.get("leisure")
-
-    if landuse == "residential":
-        return "residential"
-    if landuse == "industrial":
-        return "industrial"
-    if landuse == "commercial":
-        return "commercial"
-    if amenity == "parking":
-        return "parking"
-    if natural in {"wood", "scrub", "heath"} or leisure == "nature_reserve":
-        return "nature"
-    return None
-
-
-def map_road(tags: dict) -> str | None:
-    highway = tags.get("highway")
-    if highway in {"primary", "secondary", "residential", "service"}:
-        return highway
-    return None
+POI_BY_AMENITY = {"police": "police", "fire_station": "fire", "hospital": "hospital"}
+ZONE_BY_LANDUSE = {"residential": "residential", "industrial": "industrial", "commercial": "commercial"}
+NATURE_VALUES = frozenset({"wood", "scrub", "heath"})
+ROAD_TYPES = frozenset({"primary", "secondary", "residential", "service"})
+
+
+def classify_tags(tags: dict) -> tuple[str | None, str | None, str | None]:
+    """Return (poi_type, zone_type, road_type) from a single read of the relevant tags."""
+    get = tags.get
+    amenity = get("amenity")
+    landuse = get("landuse")
+    highway = get("highway")
+
+    poi_type = POI_BY_AMENITY.get(amenity)
+
+    zone_type = ZONE_BY_LANDUSE.get(landuse)
+    if not zone_type:
+        if amenity == "parking":
+            zone_type = "parking"
+        elif get("natural") in NATURE_VALUES or get("leisure") == "nature_reserve":
+            zone_type = "nature"
+
+    road_type = highway if highway in ROAD_TYPES else None
+    return poi_type, zone_type, road_type
+
+
+def iter_json_array(stream: BinaryIO, key: str) -> Iterator[dict]:
+    """Yield the items of the top-level array `key` while the body is still being read.
+
+    Keeps only the current chunk plus one partial item in memory instead of the whole
+    response and its parsed tree.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = stream.read(STREAM_CHUNK_BYTES)
+        if not chunk:
+            eof = True
+            buf = buf[pos:] + utf8.decode(b"", final=True)
+        else:
+            buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+        return True
+
+    marker = re.compile(rf'"{re.escape(key)}"\s*:\s*\[')
+    while True:
+        match = marker.search(buf)
+        if match:
+            pos = match.end()
+            break
+        if not fill():
+            # No such key is fine for a complete document; a body cut off before the key must not pass as empty.
+            json.loads(buf)
+            return
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buf):
+            if not fill():
+                raise ValueError(f"unterminated '{key}' array")
+            continue
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Item spans the chunk boundary; read more and retry.
+            if not fill():
+                raise
+            continue
+        pos = end
+        yield item
 
 
-def fetch_overpass(query: str) -> dict:
+def fetch_overpass(query: str) -> Iterator[dict]:
     payload = parse.urlencode({"data": query}).encode("utf-8")
-    req = request.Request(OVERPASS_URL, data=payload, method="POST")
+    req = request.Request(OVERPASS_URL, data=payload, method="POST", headers={"Accept-Encoding": "gzip"})
     with request.urlopen(req, timeout=180) as resp:
-        raw = resp.read()
-    return json.loads(raw.decode("utf-8"))
+        if resp.headers.get("Content-Encoding", "").lower() == "gzip":
+            with gzip.GzipFile(fileobj=resp) as body:
+                yield from iter_json_array(body, "elements")
+        else:
+            yield from iter_json_array(resp, "elements")
 
 
 def import_osm(south: float, west: float, north: float, east: float) -> dict:
     init_db()
-    data = fetch_overpass(build_query(south, west, north, east))
-    elements = data.get("elements", [])
-
-    imported_at = now_iso()
-    source = "osm_overpass"
+    element_count = 0
+    source = SOURCE_NAME
 
     poi_rows = []
     zone_rows = []
     road_rows = []
-
-    for element in elements:
-        tags = element.get("tags", {})
-        coords = element_coords(element)
-        if not coords:
-            continue
-
-        lat, lon = coords
-        base_id = f"{element.get('type', 'x')}:{element.get('id', uuid.uuid4())}"
-
-        poi_type = map_poi(tags)
-        if poi_type:
-            poi_rows.append((f"poi:{base_id}", poi_type, lat, lon, source, imported_at))
-
-        zone_type = map_zone(tags)
-        if zone_type:
-            zone_rows.append((f"zone:{base_id}", zone_type, lat, lon, source, imported_at))
-
-        road_type = map_road(tags)
-        if road_type:
-            road_rows.append((f"road:{base_id}", road_type, lat, lon, source, imported_at))
-
-    with get_conn() as conn:
-        conn.execute("DELETE FROM osm_poi WHERE source = ?", (source,))
-        conn.execute("DELETE FROM osm_zone WHERE source = ?", (source,))
-        conn.execute("DELETE FROM osm_road WHERE source = ?", (source,))
-
-        conn.executemany(
-            """
-            INSERT INTO osm_poi (id, poi_type, lat, lon, source, imported_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            poi_rows,
-        )
-        conn.executemany(
-            """
-            INSERT INTO osm_zone (id, zone_type, lat, lon, source, imported_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            zone_rows,
-        )
-        conn.executemany(
-            """
-            INSERT INTO osm_road (id, road_type, lat, lon, source, imported_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            road_rows,
-        )
-
-        total = len(poi_rows) + len(zone_rows) + len(road_rows)
-        conn.execute(
-            """
-            INSERT INTO data_source_state (source_name, imported_at, record_count, notes)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(source_name) DO UPDATE SET
-              imported_at = excluded.imported_at,
-              record_count = excluded.record_count,
-              notes = excluded.notes
-            """,
-            ("osm_overpass", imported_at, total, f"bbox={south},{west},{north},{east}"),
-        )
-
-    return {
-        "elements": len(elements),
-        "pois": len(poi_rows),
-        "zones": len(zone_rows),
-        "roads": len(road_rows),
-    }
+    counts = {"pois": 0, "zones": 0, "roads": 0}
+    anon_ids = itertools.count()
+
+    def flush(conn) -> None:
+        # Each chunk commits to the temp database only; the main database is not locked.
+        with conn:
+            conn.executemany(STAGE_POI_SQL, poi_rows)
+            conn.executemany(STAGE_ZONE_SQL, zone_rows)
+            conn.executemany(STAGE_ROAD_SQL, road_rows)
+        counts["pois"] += len(poi_rows)
+        counts["zones"] += len(zone_rows)
+        counts["roads"] += len(road_rows)
+        poi_rows.clear()
+        zone_rows.clear()
+        road_rows.clear()
+
+    conn = get_conn()
+    try:
+        # Spill the staging tables to a temp file instead of RAM; a country-sized extract does not fit.
+        conn.execute("PRAGMA temp_store = FILE")
+        conn.executescript(CREATE_STAGE_SQL)
+        for element in fetch_overpass(build_query(south, west, north, east)):
+            element_count += 1
+            tags = element.get("tags", {})
+            coords = element_coords(element)
+            if not coords:
+                continue
+
+            lat, lon = coords
+            element_id = element.get("id")
+            if element_id is None:
+                # Rows missing from a run are purged, so a per-run counter is unique enough.
+                element_id = f"anon{next(anon_ids)}"
+            base_id = f"{element.get('type', 'x')}:{element_id}"
+
+            poi_type, zone_type, road_type = classify_tags(tags)
+            if poi_type:
+                poi_rows.append((f"poi:{base_id}", poi_type, lat, lon))
+            if zone_type:
+                zone_rows.append((f"zone:{base_id}", zone_type, lat, lon))
+            if road_type:
+                road_rows.append((f"road:{base_id}", road_type, lat, lon))
+
+            if len(poi_rows) + len(zone_rows) + len(road_rows) >= INSERT_CHUNK_ROWS:
+                flush(conn)
+        flush(conn)
+
+        # The download is complete; the write lock now only covers applying the staged rows.
+        imported_at = now_iso()
+        with write_transaction(conn):
+            conn.execute(UPSERT_POI_SQL, (source, imported_at))
+            conn.execute(UPSERT_ZONE_SQL, (source, imported_at))
+            conn.execute(UPSERT_ROAD_SQL, (source, imported_at))
+            # Rows are upserted by id instead of wiping the tables first; drop whatever this run did not stage.
+            conn.execute(DELETE_STALE_POI_SQL, (source,))
+            conn.execute(DELETE_STALE_ZONE_SQL, (source,))
+            conn.execute(DELETE_STALE_ROAD_SQL, (source,))
+
+            total = counts["pois"] + counts["zones"] + counts["roads"]
+            conn.execute(UPSERT_SOURCE_STATE_SQL, (source, imported_at, total, f"bbox={south},{west},{north},{east}"))
+        checkpoint_wal(conn)
+    finally:
+        conn.close()
+
+    return {"elements": element_count, **counts}
 
 
 def main() -> None:
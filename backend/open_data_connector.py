@@ -1,51 +1,112 @@
 import csv
 import datetime as dt
+import functools
 import hashlib
 import json
 import math
+import os
+import sqlite3
 import subprocess
+import tempfile
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
-from urllib import request
+from urllib import error, request
 
-from db import get_conn, init_db
+from db import DB_PATH, checkpoint_wal, get_conn, get_read_conn, init_db, write_transaction
 
-VALID_TYPES = {"market", "waste", "event", "construction"}
+VALID_TYPES = frozenset({"market", "waste", "event", "construction"})
 DE_BOUNDS = {"lat_min": 47.0, "lat_max": 55.5, "lon_min": 5.0, "lon_max": 16.0}
+INSERT_CHUNK_ROWS = 10_000
+MAX_FETCH_WORKERS = 8
+HTTP_CACHE_DIR = DB_PATH.parent / "http_cache"
+HTTP_CHUNK_BYTES = 1 << 16
+_UTC = dt.timezone.utc
+_DIGITS = frozenset("0123456789")
+
+UPSERT_EVENT_SQL = """
+    INSERT INTO open_data_event (
+        id, event_type, lat, lon, start_datetime, end_datetime,
+        risk_modifier, source, imported_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+      event_type = excluded.event_type,
+      lat = excluded.lat,
+      lon = excluded.lon,
+      start_datetime = excluded.start_datetime,
+      end_datetime = excluded.end_datetime,
+      risk_modifier = excluded.risk_modifier,
+      source = excluded.source,
+      imported_at = excluded.imported_at
+"""
+DELETE_STALE_EVENTS_SQL = """
+    DELETE FROM open_data_event
+    WHERE source = ? AND id NOT IN (SELECT id FROM temp.import_event_ids)
+"""
+# Loose index scan over idx_open_data_event_source: one index seek per distinct source
+# instead of SELECT DISTINCT walking every entry of the index.
+DISTINCT_EVENT_SOURCES_SQL = """
+    WITH RECURSIVE sources(source) AS (
+      SELECT MIN(source) FROM open_data_event
+      UNION ALL
+      SELECT (SELECT MIN(source) FROM open_data_event WHERE source > sources.source)
+      FROM sources WHERE sources.source IS NOT NULL
+    )
+    SELECT source FROM sources WHERE source IS NOT NULL
+"""
+UPSERT_SOURCE_STATE_SQL = """
+    INSERT INTO data_source_state (source_name, imported_at, record_count, notes)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(source_name) DO UPDATE SET
+      imported_at = excluded.imported_at,
+      record_count = excluded.record_count,
+      notes = excluded.notes
+"""
+# An unchanged source was still synced successfully; only its timestamp moves.
+TOUCH_SOURCE_STATE_SQL = "UPDATE data_source_state SET imported_at = ? WHERE source_name = ?"
 
 
 def now_iso() -> str:
-    return dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    return dt.datetime.now(_UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+@functools.lru_cache(maxsize=1 << 16)
 def normalize_iso(value: str) -> str:
+    # Feeds repeat the same start/end values a lot (market days, recurring events), so results are cached.
     value = value.strip()
-    if value.isdigit():
+    if value and value[0] in _DIGITS and value.isdigit():
         # ArcGIS dates are commonly unix timestamps in milliseconds.
         ts = int(value)
         if ts > 10_000_000_000:
             ts = ts / 1000.0
-        parsed = dt.datetime.fromtimestamp(ts, tz=dt.timezone.utc)
-        return parsed.replace(microsecond=0).isoformat().replace("+00:00", "Z")
-    parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
-    if parsed.tzinfo is None:
-        parsed = parsed.replace(tzinfo=dt.timezone.utc)
-    return parsed.astimezone(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+        parsed = dt.datetime.fromtimestamp(ts, tz=_UTC)
+    else:
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        parsed = dt.datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=_UTC)
+        else:
+            parsed = parsed.astimezone(_UTC)
+    # isoformat() of a UTC datetime always ends in "+00:00".
+    return parsed.replace(microsecond=0).isoformat()[:-6] + "Z"
 
 
-def _get_by_path(record: dict, path: str):
-    if not path:
-        return None
+@functools.lru_cache(maxsize=1 << 14)
+def _parse_range_date(value: str, date_fmt: str) -> str:
+    # strptime is slow and date-range feeds reuse a small set of calendar days.
+    return dt.datetime.strptime(value, date_fmt).replace(tzinfo=_UTC).isoformat()
+
+
+def _get_by_tokens(record: dict, tokens: tuple[tuple[str, int | None], ...]):
     current = record
-    for token in path.split("."):
+    for key, idx in tokens:
         if isinstance(current, dict):
-            current = current.get(token)
+            current = current.get(key)
             continue
         if isinstance(current, list):
-            try:
-                idx = int(token)
-            except Exception:
-                return None
-            if idx < 0 or idx >= len(current):
+            if idx is None or idx < 0 or idx >= len(current):
                 return None
             current = current[idx]
             continue
@@ -53,78 +114,111 @@ def _get_by_path(record: dict, path: str):
     return current
 
 
+def _compile_path(path: str | None) -> Callable[[dict], object]:
+    # Split a dotted field path once per source; each token keeps its list index form precomputed.
+    if not path:
+        return lambda record: None
+    tokens = []
+    for token in path.split("."):
+        try:
+            idx = int(token)
+        except ValueError:
+            idx = None
+        tokens.append((token, idx))
+    if len(tokens) == 1:
+        key = tokens[0][0]
+        return lambda record: record.get(key)
+    return functools.partial(_get_by_tokens, tokens=tuple(tokens))
+
+
+def _compile_csv_column(header: list[str], path: str | None) -> Callable[[list[str]], str | None]:
+    # Same lookup rules as _compile_path on a DictReader row: a dotted path cannot descend into a
+    # CSV cell, a missing or short column reads as None and a repeated header name takes the last column.
+    if not path or "." in path or path not in header:
+        return lambda row: None
+    idx = len(header) - 1 - header[::-1].index(path)
+    return lambda row: row[idx] if idx < len(row) else None
+
+
 def _as_text(value) -> str:
     return "" if value is None else str(value).strip()
 
 
-def _utm_epsg25832_to_wgs84(easting: float, northing: float) -> tuple[float, float]:
-    # WGS84 / UTM zone 32N (EPSG:25832) to lat/lon conversion.
-    a = 6378137.0
-    e = 0.08181919084262149
-    e1sq = 0.00673949674227643
-    k0 = 0.9996
-
-    x = easting - 500000.0
-    y = northing
-    zone_cm = 9.0  # UTM zone 32 central meridian
+# WGS84 / UTM zone 32N (EPSG:25832) constants; everything that does not depend on the point is folded once here.
+_UTM_A = 6378137.0
+_UTM_E2 = 0.08181919084262149**2
+_UTM_E1SQ = 0.00673949674227643
+_UTM_K0 = 0.9996
+_UTM_MU_DIV = _UTM_A * (1 - _UTM_E2 / 4 - 3 * _UTM_E2**2 / 64 - 5 * _UTM_E2**3 / 256) * _UTM_K0
+_UTM_E1 = (1 - math.sqrt(1 - _UTM_E2)) / (1 + math.sqrt(1 - _UTM_E2))
+_UTM_J1 = 3 * _UTM_E1 / 2 - 27 * _UTM_E1**3 / 32
+_UTM_J2 = 21 * _UTM_E1**2 / 16 - 55 * _UTM_E1**4 / 32
+_UTM_J3 = 151 * _UTM_E1**3 / 96
+_UTM_J4 = 1097 * _UTM_E1**4 / 512
+_UTM_CM = math.radians(9.0)  # UTM zone 32 central meridian
 
-    m = y / k0
-    mu = m / (a * (1 - e**2 / 4 - 3 * e**4 / 64 - 5 * e**6 / 256))
-    e1 = (1 - math.sqrt(1 - e**2)) / (1 + math.sqrt(1 - e**2))
 
-    j1 = 3 * e1 / 2 - 27 * e1**3 / 32
-    j2 = 21 * e1**2 / 16 - 55 * e1**4 / 32
-    j3 = 151 * e1**3 / 96
-    j4 = 1097 * e1**4 / 512
-    fp = mu + j1 * math.sin(2 * mu) + j2 * math.sin(4 * mu) + j3 * math.sin(6 * mu) + j4 * math.sin(8 * mu)
+@functools.lru_cache(maxsize=1 << 14)
+def _utm_epsg25832_to_wgs84(easting: float, northing: float) -> tuple[float, float]:
+    # Recurring events (weekly markets, waste pickups) sit on the same coordinates, so conversions are cached.
+    x = easting - 500000.0
+    mu = northing / _UTM_MU_DIV
+    fp = (
+        mu
+        + _UTM_J1 * math.sin(2 * mu)
+        + _UTM_J2 * math.sin(4 * mu)
+        + _UTM_J3 * math.sin(6 * mu)
+        + _UTM_J4 * math.sin(8 * mu)
+    )
 
     sin_fp = math.sin(fp)
     cos_fp = math.cos(fp)
-    tan_fp = math.tan(fp)
+    tan_fp = sin_fp / cos_fp
 
-    c1 = e1sq * cos_fp**2
-    t1 = tan_fp**2
-    r1 = a * (1 - e**2) / (1 - e**2 * sin_fp**2) ** 1.5
-    n1 = a / math.sqrt(1 - e**2 * sin_fp**2)
-    d = x / (n1 * k0)
+    c1 = _UTM_E1SQ * cos_fp * cos_fp
+    t1 = tan_fp * tan_fp
+    w = 1 - _UTM_E2 * sin_fp * sin_fp
+    n1 = _UTM_A / math.sqrt(w)
+    r1 = _UTM_A * (1 - _UTM_E2) / (w * math.sqrt(w))
+    d = x / (n1 * _UTM_K0)
+    d2 = d * d
 
     q1 = n1 * tan_fp / r1
-    q2 = d**2 / 2
-    q3 = (5 + 3 * t1 + 10 * c1 - 4 * c1**2 - 9 * e1sq) * d**4 / 24
-    q4 = (61 + 90 * t1 + 298 * c1 + 45 * t1**2 - 252 * e1sq - 3 * c1**2) * d**6 / 720
+    q2 = d2 / 2
+    q3 = (5 + 3 * t1 + 10 * c1 - 4 * c1 * c1 - 9 * _UTM_E1SQ) * d2 * d2 / 24
+    q4 = (61 + 90 * t1 + 298 * c1 + 45 * t1 * t1 - 252 * _UTM_E1SQ - 3 * c1 * c1) * d2 * d2 * d2 / 720
     lat = fp - q1 * (q2 - q3 + q4)
 
-    q5 = d
-    q6 = (1 + 2 * t1 + c1) * d**3 / 6
-    q7 = (5 - 2 * c1 + 28 * t1 - 3 * c1**2 + 8 * e1sq + 24 * t1**2) * d**5 / 120
-    lon = math.radians(zone_cm) + (q5 - q6 + q7) / cos_fp
+    q6 = (1 + 2 * t1 + c1) * d2 * d / 6
+    q7 = (5 - 2 * c1 + 28 * t1 - 3 * c1 * c1 + 8 * _UTM_E1SQ + 24 * t1 * t1) * d2 * d2 * d / 120
+    lon = _UTM_CM + (d - q6 + q7) / cos_fp
 
     return math.degrees(lat), math.degrees(lon)
 
 
-def _stable_id(source_name: str, external_id: str | None, payload: dict) -> str:
+def _stable_id(source_prefix: bytes, external_id: str | None, payload: dict) -> str:
+    # source_prefix is the encoded "<source_name>:" built once per source; the digest equals hashing
+    # the joined string. Only needs to be stable and unique, not collision-resistant against an attacker.
+    digest = hashlib.blake2b(source_prefix, digest_size=16)
     if external_id:
-        raw = f"{source_name}:{external_id}"
+        digest.update(external_id.encode("utf-8"))
     else:
-        raw = (
-            f"{source_name}:{payload['event_type']}:{payload['lat']:.6f}:{payload['lon']:.6f}:"
-            f"{payload['start_datetime']}:{payload['end_datetime']}:{payload['risk_modifier']}"
+        digest.update(
+            f"{payload['event_type']}:{payload['lat']:.6f}:{payload['lon']:.6f}:"
+            f"{payload['start_datetime']}:{payload['end_datetime']}:{payload['risk_modifier']}".encode("utf-8")
         )
-    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return digest.hexdigest()
 
 
-def _map_event_type(raw_value: str, event_type_map: dict[str, str], default_value: str | None) -> str | None:
-    raw = (raw_value or "").strip().lower()
-    if raw and raw in event_type_map:
-        raw = event_type_map[raw]
-    if not raw and default_value:
-        raw = default_value
-    if raw in VALID_TYPES:
-        return raw
-    return None
+def _event_type_lookup(event_type_map: dict[str, str]) -> dict[str, str]:
+    # Lowercased raw value -> valid event type in one dict hit: canonical types map to themselves,
+    # config aliases override them, and aliases that end up outside VALID_TYPES are dropped.
+    lookup = {event_type: event_type for event_type in VALID_TYPES}
+    lookup.update(event_type_map)
+    return {raw: mapped for raw, mapped in lookup.items() if raw and mapped in VALID_TYPES}
 
 
-def _extract_json_records(payload: dict | list, json_path: str | None) -> list[dict]:
+def _extract_json_records(payload: dict | list, json_path: str | None) -> Iterator[dict]:
     current = payload
     if json_path:
         for part in json_path.split("."):
@@ -133,84 +227,135 @@ def _extract_json_records(payload: dict | list, json_path: str | None) -> list[d
             else:
                 current = None
             if current is None:
-                return []
+                return iter(())
     if isinstance(current, list):
-        return [item for item in current if isinstance(item, dict)]
-    return []
-
+        # Lazy over the array itself: no filtered copy, and the rest of the document can be freed.
+        return (item for item in current if isinstance(item, dict))
+    return iter(())
 
-def _read_text(location: str, config_dir: Path) -> str:
-    if location.startswith("http://") or location.startswith("https://"):
-        try:
-            with request.urlopen(location, timeout=60) as resp:
-                return resp.read().decode("utf-8", errors="replace")
-        except Exception:
-            # Fallback for environments where Python DNS/network stack is restricted.
-            raw = subprocess.check_output(["curl", "-sL", location], timeout=60)
-            return raw.decode("utf-8", errors="replace")
 
-    file_path = Path(location)
-    if not file_path.is_absolute():
-        file_path = (config_dir / location).resolve()
-    return file_path.read_text(encoding="utf-8")
+def _is_http(location: str) -> bool:
+    return location.startswith("http://") or location.startswith("https://")
 
 
-def import_event_rows(rows: list[dict], source_name: str, notes: str) -> dict:
-    init_db()
+def _fetch_http_cached(url: str) -> tuple[Path, str]:
+    # Conditional GET against an on-disk copy of the last body; returns the body path and its sha256.
+    HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    body_path = HTTP_CACHE_DIR / f"{key}.body"
+    meta_path = HTTP_CACHE_DIR / f"{key}.json"
+    meta = {}
+    if body_path.exists():
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            meta = {}
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        resp = request.urlopen(request.Request(url, headers=headers), timeout=60)
+    except error.HTTPError as exc:
+        if exc.code == 304 and meta.get("body_sha"):
+            return body_path, meta["body_sha"]
+        resp = None
+    except Exception:
+        resp = None
+
+    digest = hashlib.sha256()
+    fd, tmp_name = tempfile.mkstemp(dir=HTTP_CACHE_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            if resp is None:
+                # Fallback for environments where Python DNS/network stack is restricted.
+                raw = subprocess.check_output(["curl", "-sL", url], timeout=60)
+                tmp.write(raw)
+                digest.update(raw)
+                meta = {}
+            else:
+                with resp:
+                    while chunk := resp.read(HTTP_CHUNK_BYTES):
+                        tmp.write(chunk)
+                        digest.update(chunk)
+                    meta = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+        os.replace(tmp_name, body_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    meta["body_sha"] = digest.hexdigest()
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    return body_path, meta["body_sha"]
+
+
+def _stored_source_state(source_name: str):
+    with get_read_conn() as conn:
+        return conn.execute(
+            "SELECT notes, record_count FROM data_source_state WHERE source_name = ?", (source_name,)
+        ).fetchone()
+
+
+def import_event_rows(
+    rows: list[dict],
+    source_name: str,
+    notes: str,
+    normalized: bool = False,
+    conn: sqlite3.Connection | None = None,
+) -> dict:
     imported_at = now_iso()
 
     db_rows = []
-    seen_ids = set()
     for item in rows:
         event_type = item.get("event_type")
         if event_type not in VALID_TYPES:
             continue
-        if item["id"] in seen_ids:
-            continue
-        seen_ids.add(item["id"])
 
+        start_iso = item["start_datetime"]
+        end_iso = item["end_datetime"]
+        # Connector rows arrive normalized already; only raw CSV rows still need parsing.
+        if not normalized:
+            start_iso = normalize_iso(start_iso)
+            end_iso = normalize_iso(end_iso)
         db_rows.append(
             (
                 item["id"],
                 event_type,
                 float(item["lat"]),
                 float(item["lon"]),
-                normalize_iso(item["start_datetime"]),
-                normalize_iso(item["end_datetime"]),
+                start_iso,
+                end_iso,
                 int(item["risk_modifier"]),
                 source_name,
                 imported_at,
             )
         )
 
-    with get_conn() as conn:
-        conn.execute("DELETE FROM open_data_event WHERE source = ?", (source_name,))
-        conn.executemany(
-            """
-            INSERT INTO open_data_event (
-                id, event_type, lat, lon, start_datetime, end_datetime,
-                risk_modifier, source, imported_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            db_rows,
-        )
-        conn.execute(
-            """
-            INSERT INTO data_source_state (source_name, imported_at, record_count, notes)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(source_name) DO UPDATE SET
-              imported_at = excluded.imported_at,
-              record_count = excluded.record_count,
-              notes = excluded.notes
-            """,
-            (source_name, imported_at, len(db_rows), notes),
-        )
+    with write_transaction(conn) as conn:
+        # Upsert by id, then drop only the rows of this source that the new batch no longer contains.
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_event_ids (id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM temp.import_event_ids")
+        for start in range(0, len(db_rows), INSERT_CHUNK_ROWS):
+            chunk = db_rows[start : start + INSERT_CHUNK_ROWS]
+            conn.executemany(UPSERT_EVENT_SQL, chunk)
+            conn.executemany("INSERT OR IGNORE INTO temp.import_event_ids (id) VALUES (?)", ((row[0],) for row in chunk))
+        conn.execute(DELETE_STALE_EVENTS_SQL, (source_name,))
+        conn.execute(UPSERT_SOURCE_STATE_SQL, (source_name, imported_at, len(db_rows), notes))
 
     return {"rows": len(db_rows), "source_name": source_name}
 
 
-def import_from_source(source_cfg: dict, config_dir: Path) -> dict:
-    source_name = source_cfg.get("source_name") or source_cfg.get("id") or "open_data_source"
+def _source_name(source_cfg: dict) -> str:
+    return source_cfg.get("source_name") or source_cfg.get("id") or "open_data_source"
+
+
+def fetch_source_rows(source_cfg: dict, config_dir: Path) -> tuple[list[dict] | None, dict, str]:
+    # Download + parse only; never writes to the database, so it is safe to run on worker threads.
+    # Returns rows=None when the source is unchanged since its last import.
+    source_name = _source_name(source_cfg)
     location = source_cfg.get("url") or source_cfg.get("file")
     if not location:
         raise ValueError(f"source '{source_name}' missing url/file")
@@ -223,150 +368,219 @@ def import_from_source(source_cfg: dict, config_dir: Path) -> dict:
     date_range_cfg = source_cfg.get("date_range")
     coord_crs = str(source_cfg.get("coord_crs", "")).upper().strip()
 
-    text = _read_text(location, config_dir)
+    if source_format not in ("csv", "json"):
+        raise ValueError(f"unsupported format: {source_format}")
 
-    records: list[dict]
-    if source_format == "csv":
-        reader = csv.DictReader(text.splitlines())
-        records = [dict(row) for row in reader]
-    elif source_format == "json":
-        payload = json.loads(text)
-        records = _extract_json_records(payload, json_path)
+    note = f"connector={source_cfg.get('id', source_name)} location={location} format={source_format}"
+    if _is_http(location):
+        body_path, body_sha = _fetch_http_cached(location)
+        cfg_json = json.dumps(source_cfg, sort_keys=True)
+        fingerprint = hashlib.blake2b(f"{body_sha}:{cfg_json}".encode("utf-8"), digest_size=8).hexdigest()
+        note = f"{note} sha={fingerprint}"
+        # Same body and same connector config as the last committed import: the stored rows are current.
+        state = _stored_source_state(source_name)
+        if state is not None and state["notes"] == note:
+            count = state["record_count"]
+            return None, {"rows": count, "accepted": count, "unchanged": True}, note
+        text_path = body_path
+        text_errors = "replace"
     else:
-        raise ValueError(f"unsupported format: {source_format}")
+        text_path = Path(location)
+        if not text_path.is_absolute():
+            text_path = (config_dir / location).resolve()
+        text_errors = "strict"
+
+    # Everything derived from the source config is bound once; the record loop only touches locals.
+    lat_key = field_map.get("lat", "lat")
+    lon_key = field_map.get("lon", "lon")
+    start_key = field_map.get("start_datetime", "start_datetime")
+    end_key = field_map.get("end_datetime", "end_datetime")
+    risk_key = field_map.get("risk_modifier", "risk_modifier")
+    event_type_key = field_map.get("event_type", "event_type")
+    external_id_key = field_map.get("external_id")
+    range_key = date_range_cfg.get("field", "") if date_range_cfg else ""
+    id_prefix = f"{source_name}:".encode("utf-8")
+    event_types = _event_type_lookup(event_type_map)
+    default_event_type = defaults.get("event_type")
+    fallback_event_type = default_event_type if default_event_type and default_event_type in VALID_TYPES else None
+    default_event_type_text = _as_text(defaults.get("event_type", ""))
+    default_lat = _as_text(defaults.get("lat", ""))
+    default_lon = _as_text(defaults.get("lon", ""))
+    default_start = _as_text(defaults.get("start_datetime", ""))
+    default_end = _as_text(defaults.get("end_datetime", ""))
+    default_risk = _as_text(defaults.get("risk_modifier", "0"))
+    is_utm32 = coord_crs == "EPSG:25832"
+    if date_range_cfg:
+        separator = date_range_cfg.get("separator", " bis ")
+        date_fmt = date_range_cfg.get("input_date_format", "%d-%m-%Y")
+    lat_min, lat_max = DE_BOUNDS["lat_min"], DE_BOUNDS["lat_max"]
+    lon_min, lon_max = DE_BOUNDS["lon_min"], DE_BOUNDS["lon_max"]
 
     rows = []
     stats = {
-        "input_records": len(records),
+        "input_records": 0,
         "accepted": 0,
         "rejected_invalid_event_type": 0,
         "rejected_parse_error": 0,
         "rejected_missing_datetime": 0,
         "rejected_out_of_bounds": 0,
         "rejected_invalid_window": 0,
+        "rejected_duplicate": 0,
     }
-    for record in records:
-        lat_key = field_map.get("lat", "lat")
-        lon_key = field_map.get("lon", "lon")
-        start_key = field_map.get("start_datetime", "start_datetime")
-        end_key = field_map.get("end_datetime", "end_datetime")
-        risk_key = field_map.get("risk_modifier", "risk_modifier")
-        event_type_key = field_map.get("event_type", "event_type")
-        external_id_key = field_map.get("external_id")
-
-        raw_event_type = _as_text(_get_by_path(record, event_type_key))
-        if not raw_event_type:
-            raw_event_type = _as_text(defaults.get("event_type", ""))
-        event_type = _map_event_type(raw_event_type, event_type_map, defaults.get("event_type"))
-        if not event_type:
-            stats["rejected_invalid_event_type"] += 1
-            continue
-
-        try:
-            lat_raw = _get_by_path(record, lat_key)
-            lon_raw = _get_by_path(record, lon_key)
-            lat = float(_as_text(lat_raw) or _as_text(defaults.get("lat", "")))
-            lon = float(_as_text(lon_raw) or _as_text(defaults.get("lon", "")))
-            if coord_crs == "EPSG:25832":
-                lat, lon = _utm_epsg25832_to_wgs84(lon, lat)
-
-            start_dt = _as_text(_get_by_path(record, start_key)) or _as_text(defaults.get("start_datetime", ""))
-            end_dt = _as_text(_get_by_path(record, end_key)) or _as_text(defaults.get("end_datetime", ""))
-
-            if date_range_cfg and (not start_dt or not end_dt):
-                range_field = _as_text(_get_by_path(record, date_range_cfg.get("field", "")))
-                separator = date_range_cfg.get("separator", " bis ")
-                date_fmt = date_range_cfg.get("input_date_format", "%d-%m-%Y")
-                if separator in range_field:
-                    start_raw, end_raw = [part.strip() for part in range_field.split(separator, 1)]
-                    start_dt = dt.datetime.strptime(start_raw, date_fmt).replace(tzinfo=dt.timezone.utc).isoformat()
-                    end_dt = dt.datetime.strptime(end_raw, date_fmt).replace(tzinfo=dt.timezone.utc).isoformat()
-
-            risk_raw = _get_by_path(record, risk_key)
-            risk_modifier = int(_as_text(risk_raw) or _as_text(defaults.get("risk_modifier", "0")))
-        except Exception:
-            stats["rejected_parse_error"] += 1
-            continue
+    seen_ids = set()
+    with ExitStack() as stack:
+        if source_format == "csv":
+            # CSV rows are consumed straight off the file and stay plain lists; fields resolve to column indexes.
+            fh = stack.enter_context(text_path.open("r", encoding="utf-8", errors=text_errors, newline=""))
+            reader = csv.reader(fh)
+            compile_path = functools.partial(_compile_csv_column, next(reader, []))
+            records = (row for row in reader if row)
+        else:
+            # json.loads decodes the raw bytes itself (BOM aware), so no separate str copy of the body is made.
+            compile_path = _compile_path
+            records = _extract_json_records(json.loads(text_path.read_bytes()), json_path)
+        get_lat = compile_path(lat_key)
+        get_lon = compile_path(lon_key)
+        get_start = compile_path(start_key)
+        get_end = compile_path(end_key)
+        get_risk = compile_path(risk_key)
+        get_event_type = compile_path(event_type_key)
+        get_external_id = compile_path(external_id_key)
+        get_range = compile_path(range_key)
+        for record in records:
+            stats["input_records"] += 1
+
+            raw_event_type = (_as_text(get_event_type(record)) or default_event_type_text).lower()
+            event_type = event_types.get(raw_event_type) if raw_event_type else fallback_event_type
+            if not event_type:
+                stats["rejected_invalid_event_type"] += 1
+                continue
 
-        if not start_dt or not end_dt:
-            stats["rejected_missing_datetime"] += 1
-            continue
+            try:
+                lat_raw = get_lat(record)
+                lon_raw = get_lon(record)
+                lat = float(_as_text(lat_raw) or default_lat)
+                lon = float(_as_text(lon_raw) or default_lon)
+                if is_utm32:
+                    lat, lon = _utm_epsg25832_to_wgs84(lon, lat)
+
+                start_dt = _as_text(get_start(record)) or default_start
+                end_dt = _as_text(get_end(record)) or default_end
+
+                if date_range_cfg and (not start_dt or not end_dt):
+                    range_field = _as_text(get_range(record))
+                    if separator in range_field:
+                        start_raw, end_raw = [part.strip() for part in range_field.split(separator, 1)]
+                        start_dt = _parse_range_date(start_raw, date_fmt)
+                        end_dt = _parse_range_date(end_raw, date_fmt)
+
+                risk_raw = get_risk(record)
+                risk_modifier = int(_as_text(risk_raw) or default_risk)
+            except Exception:
+                stats["rejected_parse_error"] += 1
+                continue
 
-        if not (
-            DE_BOUNDS["lat_min"] <= lat <= DE_BOUNDS["lat_max"]
-            and DE_BOUNDS["lon_min"] <= lon <= DE_BOUNDS["lon_max"]
-        ):
-            stats["rejected_out_of_bounds"] += 1
-            continue
+            if not start_dt or not end_dt:
+                stats["rejected_missing_datetime"] += 1
+                continue
 
-        try:
-            start_iso = normalize_iso(start_dt)
-            end_iso = normalize_iso(end_dt)
-        except Exception:
-            stats["rejected_parse_error"] += 1
-            continue
+            if not (lat_min <= lat <= lat_max and lon_min <= lon <= lon_max):
+                stats["rejected_out_of_bounds"] += 1
+                continue
 
-        if end_iso <= start_iso:
-            stats["rejected_invalid_window"] += 1
-            continue
-
-        external_id = None
-        if external_id_key:
-            value = _get_by_path(record, external_id_key)
-            external_id = str(value).strip() if value is not None else None
-
-        payload = {
-            "event_type": event_type,
-            "lat": lat,
-            "lon": lon,
-            "start_datetime": start_iso,
-            "end_datetime": end_iso,
-            "risk_modifier": risk_modifier,
+            try:
+                start_iso = normalize_iso(start_dt)
+                end_iso = normalize_iso(end_dt)
+            except Exception:
+                stats["rejected_parse_error"] += 1
+                continue
+
+            if end_iso <= start_iso:
+                stats["rejected_invalid_window"] += 1
+                continue
+
+            external_id = None
+            if external_id_key:
+                value = get_external_id(record)
+                external_id = str(value).strip() if value is not None else None
+
+            payload = {
+                "event_type": event_type,
+                "lat": lat,
+                "lon": lon,
+                "start_datetime": start_iso,
+                "end_datetime": end_iso,
+                "risk_modifier": risk_modifier,
+            }
+            payload["id"] = _stable_id(id_prefix, external_id, payload)
+            if payload["id"] in seen_ids:
+                stats["rejected_duplicate"] += 1
+                continue
+            seen_ids.add(payload["id"])
+            rows.append(payload)
+            stats["accepted"] += 1
+
+    return rows, stats, note
+
+
+def persist_source_rows(
+    source_cfg: dict,
+    fetched: tuple[list[dict], dict, str],
+    conn: sqlite3.Connection | None = None,
+) -> dict:
+    rows, stats, note = fetched
+    source_name = _source_name(source_cfg)
+    if rows is None:
+        with write_transaction(conn) as conn:
+            conn.execute(TOUCH_SOURCE_STATE_SQL, (now_iso(), source_name))
+        return {
+            "rows": stats["rows"],
+            "source_name": source_name,
+            "connector_id": source_cfg.get("id", source_name),
+            "unchanged": True,
+            "stats": stats,
         }
-        payload["id"] = _stable_id(source_name, external_id, payload)
-        rows.append(payload)
-        stats["accepted"] += 1
-
-    note = f"connector={source_cfg.get('id', source_name)} location={location} format={source_format}"
-    result = import_event_rows(rows, source_name=source_name, notes=note)
+    result = import_event_rows(rows, source_name=source_name, notes=note, normalized=True, conn=conn)
     result["connector_id"] = source_cfg.get("id", source_name)
     result["stats"] = stats
     return result
 
 
-def prune_sources_not_in_config(config_source_names: set[str], protected_sources: set[str] | None = None) -> dict:
+def import_from_source(source_cfg: dict, config_dir: Path, conn: sqlite3.Connection | None = None) -> dict:
+    return persist_source_rows(source_cfg, fetch_source_rows(source_cfg, config_dir), conn=conn)
+
+
+def _delete_source_events(conn: sqlite3.Connection, source_names: list[str]) -> int:
+    # One DELETE for all sources; rowcount doubles as the number of pruned rows.
+    if not source_names:
+        return 0
+    placeholders = ",".join("?" * len(source_names))
+    return conn.execute(f"DELETE FROM open_data_event WHERE source IN ({placeholders})", source_names).rowcount
+
+
+def prune_sources_not_in_config(
+    config_source_names: set[str],
+    protected_sources: set[str] | None = None,
+    conn: sqlite3.Connection | None = None,
+) -> dict:
     protected = protected_sources or {"osm_overpass"}
-    with get_conn() as conn:
-        rows = conn.execute("SELECT DISTINCT source FROM open_data_event").fetchall()
+    with write_transaction(conn) as conn:
+        rows = conn.execute(DISTINCT_EVENT_SOURCES_SQL).fetchall()
         existing_sources = {row["source"] for row in rows}
         state_rows = conn.execute("SELECT source_name FROM data_source_state").fetchall()
         existing_state_sources = {row["source_name"] for row in state_rows}
 
         to_prune = sorted((existing_sources - config_source_names) - protected)
         state_to_mark = sorted((existing_state_sources - config_source_names) - protected)
-        pruned_rows = 0
         ts = now_iso()
-        for source_name in to_prune:
-            count = conn.execute("SELECT COUNT(*) AS c FROM open_data_event WHERE source = ?", (source_name,)).fetchone()["c"]
-            pruned_rows += int(count)
-            conn.execute("DELETE FROM open_data_event WHERE source = ?", (source_name,))
-        for source_name in state_to_mark:
-            conn.execute(
-                """
-                INSERT INTO data_source_state (source_name, imported_at, record_count, notes)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(source_name) DO UPDATE SET
-                  imported_at = excluded.imported_at,
-                  record_count = excluded.record_count,
-                  notes = excluded.notes
-                """,
-                (source_name, ts, 0, "pruned_not_in_config"),
-            )
+        pruned_rows = _delete_source_events(conn, to_prune)
+        conn.executemany(UPSERT_SOURCE_STATE_SQL, [(name, ts, 0, "pruned_not_in_config") for name in state_to_mark])
 
     return {"sources": sorted(set(to_prune + state_to_mark)), "rows": pruned_rows}
 
 
 def import_from_config(config_path: Path, prune_legacy: bool = False) -> dict:
+    init_db()
     cfg = json.loads(config_path.read_text(encoding="utf-8"))
     sources = cfg.get("sources")
     if not isinstance(sources, list):
@@ -374,49 +588,68 @@ def import_from_config(config_path: Path, prune_legacy: bool = False) -> dict:
 
     imported = []
     skipped = []
+    enabled_sources = []
     disabled_source_names = []
     all_source_names = set()
     for source in sources:
         if not isinstance(source, dict):
             continue
-        source_name = source.get("source_name") or source.get("id") or "open_data_source"
+        source_name = _source_name(source)
         all_source_names.add(source_name)
         if not source.get("enabled", False):
             skipped.append(source.get("id", "unknown"))
             disabled_source_names.append(source_name)
             continue
-        try:
-            imported.append(import_from_source(source, config_path.parent))
-        except Exception as exc:
-            imported.append(
-                {
-                    "connector_id": source.get("id", source_name),
-                    "source_name": source_name,
-                    "rows": 0,
-                    "error": str(exc),
-                }
-            )
-
-    if disabled_source_names:
-        ts = now_iso()
-        with get_conn() as conn:
-            for source_name in disabled_source_names:
-                conn.execute("DELETE FROM open_data_event WHERE source = ?", (source_name,))
-                conn.execute(
-                    """
-                    INSERT INTO data_source_state (source_name, imported_at, record_count, notes)
-                    VALUES (?, ?, ?, ?)
-                    ON CONFLICT(source_name) DO UPDATE SET
-                      imported_at = excluded.imported_at,
-                      record_count = excluded.record_count,
-                      notes = excluded.notes
-                    """,
-                    (source_name, ts, 0, "disabled in config"),
+        enabled_sources.append(source)
+
+    # Downloads run concurrently and finish before the write lock is taken, so slow endpoints
+    # never hold up other writers.
+    fetched = []
+    if enabled_sources:
+        with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(enabled_sources))) as pool:
+            futures = [pool.submit(fetch_source_rows, source, config_path.parent) for source in enabled_sources]
+            for source, future in zip(enabled_sources, futures):
+                try:
+                    fetched.append((source, future.result(), None))
+                except Exception as exc:
+                    fetched.append((source, None, exc))
+
+    # The whole run is one transaction (one commit/sync); every source writes inside its own savepoint,
+    # so a failing source is rolled back alone.
+    conn = get_conn()
+    try:
+        with write_transaction(conn):
+            for source, result, exc in fetched:
+                if exc is None:
+                    try:
+                        imported.append(persist_source_rows(source, result, conn=conn))
+                        continue
+                    except Exception as persist_exc:
+                        exc = persist_exc
+                source_name = _source_name(source)
+                imported.append(
+                    {
+                        "connector_id": source.get("id", source_name),
+                        "source_name": source_name,
+                        "rows": 0,
+                        "error": str(exc),
+                    }
                 )
 
-    pruned = {"sources": [], "rows": 0}
-    if prune_legacy:
-        pruned = prune_sources_not_in_config(all_source_names)
+            if disabled_source_names:
+                ts = now_iso()
+                with write_transaction(conn):
+                    _delete_source_events(conn, disabled_source_names)
+                    conn.executemany(
+                        UPSERT_SOURCE_STATE_SQL, [(name, ts, 0, "disabled in config") for name in disabled_source_names]
+                    )
+
+            pruned = {"sources": [], "rows": 0}
+            if prune_legacy:
+                pruned = prune_sources_not_in_config(all_source_names, conn=conn)
+        checkpoint_wal(conn)
+    finally:
+        conn.close()
 
     return {
       "imported": imported,
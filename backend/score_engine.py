@@ -1,6 +1,9 @@
 import datetime as dt
+import functools
+import hashlib
 import math
 import uuid
+from collections.abc import Iterable
 from dataclasses import dataclass
 
 NRW_HOLIDAYS_2026 = {
@@ -16,6 +19,7 @@ NRW_HOLIDAYS_2026 = {
     dt.date(2026, 12, 25),
     dt.date(2026, 12, 26),
 }
+_HOLIDAY_ORDINALS = frozenset(day.toordinal() for day in NRW_HOLIDAYS_2026)
 
 POLICE_POINTS = [
     (51.2507, 6.9751),  # Mettmann
@@ -56,7 +60,11 @@ MAIN_ROAD_POINTS = [
 ]
 
 
-@dataclass
+EARTH_RADIUS_M = 6371000
+
+
+# Frozen: the area factors are shared module constants.
+@dataclass(frozen=True, slots=True)
 class Factor:
     key: str
     label: str
@@ -64,75 +72,278 @@ class Factor:
 
 
 def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    r = 6371000
+    r = EARTH_RADIUS_M
     p1 = math.radians(lat1)
     p2 = math.radians(lat2)
-    dp = math.radians(lat2 - lat1)
-    dl = math.radians(lon2 - lon1)
-    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    s_dp = math.sin(math.radians(lat2 - lat1) / 2)
+    s_dl = math.sin(math.radians(lon2 - lon1) / 2)
+    a = s_dp * s_dp + math.cos(p1) * math.cos(p2) * (s_dl * s_dl)
     return 2 * r * math.asin(math.sqrt(a))
 
 
-def nearest_distance_m(lat: float, lon: float, points: list[tuple[float, float]]) -> int:
-    return int(min(haversine_m(lat, lon, p_lat, p_lon) for p_lat, p_lon in points))
+def nearest_haversine_m(lat: float, lon: float, points: Iterable[tuple[float, float]]) -> float:
+    # Batch form of haversine_m over many points: the query-side terms are computed once, and since the
+    # distance grows with the haversine term `a`, only the smallest `a` is turned into meters.
+    # Raises ValueError on an empty set, like min().
+    # Trig functions are bound to locals: the loop body is otherwise dominated by attribute lookups.
+    sin = math.sin
+    cos = math.cos
+    radians = math.radians
+    cos_p1 = cos(radians(lat))
+    best_a = math.inf
+    for p_lat, p_lon in points:
+        s_dp = sin(radians(p_lat - lat) / 2)
+        s_dl = sin(radians(p_lon - lon) / 2)
+        a = s_dp * s_dp + cos_p1 * cos(radians(p_lat)) * (s_dl * s_dl)
+        if a < best_a:
+            best_a = a
+    if best_a == math.inf:
+        raise ValueError("nearest_haversine_m() arg is an empty sequence")
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(best_a))
+
+
+def bbox_around(lat: float, lon: float, radius_m: float) -> tuple[float, float, float, float]:
+    """Return (min_lat, max_lat, min_lon, max_lon) of a box enclosing the radius."""
+    dlat = radius_m / 111_320.0
+    dlon = radius_m / (111_320.0 * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    # Straight-line distance between unit vectors grows monotonically with the great-circle distance,
+    # so nearest-neighbour search can run on plain coordinates without trig per candidate.
+    p = math.radians(lat)
+    lam = math.radians(lon)
+    cos_p = math.cos(p)
+    return cos_p * math.cos(lam), cos_p * math.sin(lam), math.sin(p)
+
+
+def chord2_to_m(chord2: float) -> float:
+    # Great-circle distance for a squared chord between unit vectors; same value as haversine_m.
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(chord2) / 2))
+
+
+class PointIndex:
+    # KD-tree over a fixed point set, built on unit vectors. Sets of up to LEAF_SIZE points are a
+    # single leaf, i.e. a plain scan. Points can carry a label (e.g. a zone type) so that several
+    # point sets are searched in one pass.
+    LEAF_SIZE = 8
+
+    def __init__(self, points: Iterable[tuple[float, float]], labels: Iterable[str] | None = None) -> None:
+        self.points = list(points)
+        labels = [None] * len(self.points) if labels is None else list(labels)
+        if len(labels) != len(self.points):
+            raise ValueError("PointIndex() needs one label per point")
+        entries = [
+            (*unit_vector(p_lat, p_lon), p_lat, p_lon, label) for (p_lat, p_lon), label in zip(self.points, labels)
+        ]
+        self._root = self._build(entries, 0)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self, entries: list, depth: int):
+        if len(entries) <= self.LEAF_SIZE:
+            return entries
+        axis = depth % 3
+        entries.sort(key=lambda entry: entry[axis])
+        mid = len(entries) // 2
+        return (axis, entries[mid][axis], self._build(entries[:mid], depth + 1), self._build(entries[mid:], depth + 1))
+
+    def nearest_point(self, lat: float, lon: float) -> tuple[float, float] | None:
+        entry, _ = self._nearest(unit_vector(lat, lon))
+        if entry is None:
+            return None
+        return entry[3], entry[4]
+
+    def nearest_distance_m(self, lat: float, lon: float) -> float:
+        # The search already has the squared chord to the winner; no haversine needed on top.
+        entry, best_d2 = self._nearest(unit_vector(lat, lon))
+        if entry is None:
+            raise ValueError("nearest_distance_m() on an empty PointIndex")
+        return chord2_to_m(best_d2)
+
+    def nearest_within(self, query: tuple[float, float, float], radius_m: float) -> tuple[str | None, float] | None:
+        # (label, distance in meters) of the nearest point no farther than radius_m from the unit_vector()
+        # query, else None. The radius is the initial search bound, so anything beyond it is pruned.
+        chord = 2 * math.sin(min(radius_m / (2 * EARTH_RADIUS_M), math.pi / 2))
+        entry, best_d2 = self._nearest(query, chord * chord * (1 + 1e-9))
+        if entry is None:
+            return None
+        dist = chord2_to_m(best_d2)
+        if dist > radius_m:
+            return None
+        return entry[5], dist
+
+    def within(self, query: tuple[float, float, float], radius_m: float) -> list[tuple[str | None, float]]:
+        # (label, distance in meters) of every point no farther than radius_m from the unit_vector() query.
+        chord = 2 * math.sin(min(radius_m / (2 * EARTH_RADIUS_M), math.pi / 2))
+        max_d2 = chord * chord * (1 + 1e-9)
+        qx, qy, qz = query
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                for entry in node:
+                    d2 = (entry[0] - qx) ** 2 + (entry[1] - qy) ** 2 + (entry[2] - qz) ** 2
+                    if d2 <= max_d2:
+                        dist = chord2_to_m(d2)
+                        if dist <= radius_m:
+                            found.append((entry[5], dist))
+                continue
+            axis, split, left, right = node
+            diff = query[axis] - split
+            stack.append(left if diff < 0 else right)
+            if diff * diff <= max_d2:
+                stack.append(right if diff < 0 else left)
+        return found
+
+    def _nearest(self, query: tuple[float, float, float], max_d2: float = math.inf) -> tuple[tuple | None, float]:
+        qx, qy, qz = query
+        best = None
+        best_d2 = max_d2
+        if isinstance(self._root, list):
+            # Small sets (the built-in POI lists): one leaf, no traversal bookkeeping.
+            for entry in self._root:
+                d2 = (entry[0] - qx) ** 2 + (entry[1] - qy) ** 2 + (entry[2] - qz) ** 2
+                if d2 < best_d2:
+                    best_d2 = d2
+                    best = entry
+            return best, best_d2
+        stack = [(self._root, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound >= best_d2:
+                continue
+            if isinstance(node, list):
+                for entry in node:
+                    d2 = (entry[0] - qx) ** 2 + (entry[1] - qy) ** 2 + (entry[2] - qz) ** 2
+                    if d2 < best_d2:
+                        best_d2 = d2
+                        best = entry
+                continue
+            axis, split, left, right = node
+            diff = query[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            stack.append((far, diff * diff))
+            stack.append((near, bound))
+        return best, best_d2
+
+
+def nearest_distance_m(lat: float, lon: float, points: PointIndex | list[tuple[float, float]]) -> int:
+    if isinstance(points, PointIndex):
+        return int(points.nearest_distance_m(lat, lon))
+    return int(nearest_haversine_m(lat, lon, points))
+
+
+POLICE_INDEX = PointIndex(POLICE_POINTS)
+FIRE_INDEX = PointIndex(FIRE_POINTS)
+HOSPITAL_INDEX = PointIndex(HOSPITAL_POINTS)
+# Listed in tie-break order: distances compare as whole meters, and on the same meter the earlier zone type wins.
+AREA_ZONES = (
+    ("industrial", INDUSTRIAL_ZONES),
+    ("commercial", COMMERCIAL_ZONES),
+    ("nature", NATURE_ZONES),
+    ("parking", PARKING_ZONES),
+)
+AREA_ZONE_INDEX = PointIndex(
+    [point for _, zones in AREA_ZONES for point in zones],
+    labels=[zone_type for zone_type, zones in AREA_ZONES for _ in zones],
+)
+AREA_ZONE_RANK = {zone_type: rank for rank, (zone_type, _) in enumerate(AREA_ZONES)}
+MAIN_ROAD_INDEX = PointIndex(MAIN_ROAD_POINTS)
+
+
+def nearest_zone_type(query: tuple[float, float, float], index: PointIndex, max_m: int) -> str | None:
+    # Zone type of the nearest point within max_m whole meters of the unit_vector() query, else None.
+    # Like int(nearest_distance_m()) per type: every type within the winner's meter ties, first in AREA_ZONES wins.
+    zone = index.nearest_within(query, max_m + 1)
+    if zone is None or int(zone[1]) > max_m:
+        return None
+    meter = int(zone[1])
+    tied = [label for label, dist in index.within(query, meter + 1) if int(dist) == meter]
+    return min(tied, key=lambda label: AREA_ZONE_RANK.get(label, len(AREA_ZONE_RANK)))
+
+
+# Spots are keyed on lat/lon rounded to 4 decimals (~11 m). The per-location helpers below work on that
+# same grid, so a spot always gets one answer and repeated lookups are served from a cache.
+SPOT_DECIMALS = 4
+LOCATION_CACHE_SIZE = 65536
+
+
+def classify(lat: float, lon: float) -> tuple[str, str]:
+    # (area_type, road_type); both come from one projection of the query and one cache entry.
+    return _classify_at(round(lat, SPOT_DECIMALS), round(lon, SPOT_DECIMALS))
 
 
 def classify_area(lat: float, lon: float) -> str:
-    candidates = [
-        ("industrial", nearest_distance_m(lat, lon, INDUSTRIAL_ZONES)),
-        ("commercial", nearest_distance_m(lat, lon, COMMERCIAL_ZONES)),
-        ("nature", nearest_distance_m(lat, lon, NATURE_ZONES)),
-        ("parking", nearest_distance_m(lat, lon, PARKING_ZONES)),
-    ]
-    best_type, best_dist = min(candidates, key=lambda x: x[1])
-    if best_dist <= 400:
-        return best_type
-    return "residential"
+    return classify(lat, lon)[0]
 
 
 def classify_road(lat: float, lon: float) -> str:
-    if nearest_distance_m(lat, lon, MAIN_ROAD_POINTS) < 250:
-        return "primary"
-    return "residential"
+    return classify(lat, lon)[1]
+
+
+@functools.lru_cache(maxsize=LOCATION_CACHE_SIZE)
+def _classify_at(lat: float, lon: float) -> tuple[str, str]:
+    query = unit_vector(lat, lon)
+    area_type = nearest_zone_type(query, AREA_ZONE_INDEX, 400) or "residential"
+    road = MAIN_ROAD_INDEX.nearest_within(query, 250)
+    road_type = "primary" if road is not None and road[1] < 250 else "residential"
+    return area_type, road_type
 
 
 def spot_id_for(lat: float, lon: float) -> str:
-    key = f"{lat:.4f}:{lon:.4f}"
-    return str(uuid.uuid5(uuid.NAMESPACE_DNS, f"staysense:{key}"))
+    return _spot_id_at(round(lat, SPOT_DECIMALS), round(lon, SPOT_DECIMALS))
+
+
+# Spot ids are stored and handed to clients, so they stay uuid5(NAMESPACE_DNS, "staysense:<lat>:<lon>");
+# the digest is just formatted directly instead of going through a UUID object.
+# The hash state after the constant namespace and "staysense:" prefix is computed once and copied per id.
+_SPOT_ID_HASH_PREFIX = hashlib.sha1(uuid.NAMESPACE_DNS.bytes + b"staysense:")
+
+
+@functools.lru_cache(maxsize=LOCATION_CACHE_SIZE)
+def _spot_id_at(lat: float, lon: float) -> str:
+    hasher = _SPOT_ID_HASH_PREFIX.copy()
+    hasher.update(b"%.4f:%.4f" % (lat, lon))
+    digest = bytearray(hasher.digest()[:16])
+    digest[6] = (digest[6] & 0x0F) | 0x50  # version 5
+    digest[8] = (digest[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = digest.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+AREA_FACTORS = {
+    "residential": Factor("area", "Wohngebiet", -10),
+    "industrial": Factor("area", "Industriegebiet", 10),
+    "commercial": Factor("area", "Gewerbegebiet", 6),
+    "parking": Factor("area", "Parkplatzumfeld", -5),
+    "nature": Factor("area", "Naturnah", 8),
+}
+DEFAULT_AREA_FACTOR = Factor("area", "Umgebung", 0)
 
 
 def score_area_modifier(area_type: str) -> Factor:
-    mapping = {
-        "residential": Factor("area", "Wohngebiet", -10),
-        "industrial": Factor("area", "Industriegebiet", 10),
-        "commercial": Factor("area", "Gewerbegebiet", 6),
-        "parking": Factor("area", "Parkplatzumfeld", -5),
-        "nature": Factor("area", "Naturnah", 8),
-    }
-    return mapping.get(area_type, Factor("area", "Umgebung", 0))
+    return AREA_FACTORS.get(area_type, DEFAULT_AREA_FACTOR)
 
 
 def night_window_for(reference: dt.datetime) -> tuple[dt.datetime, dt.datetime]:
-    ref = reference.replace(second=0, microsecond=0)
-    if ref.hour >= 22:
-        start = ref.replace(hour=22, minute=0)
-    elif ref.hour < 6:
-        start = (ref - dt.timedelta(days=1)).replace(hour=22, minute=0)
-    else:
-        start = ref.replace(hour=22, minute=0)
-    end = start + dt.timedelta(hours=8)
-    return start, end
+    # Before 06:00 we are still in the night that started yesterday; otherwise it is tonight's.
+    if reference.hour < 6:
+        reference -= dt.timedelta(days=1)
+    start = reference.replace(hour=22, minute=0, second=0, microsecond=0)
+    return start, start + dt.timedelta(hours=8)
 
 
 def weekend_or_holiday(night_start: dt.datetime) -> bool:
+    # Friday and Saturday nights run into a weekend morning; Sunday night ends on a workday.
     weekday = night_start.weekday()  # 0=Mon, 4=Fri
-    if weekday in (4, 5):
-        return True
-    if night_start.date() in NRW_HOLIDAYS_2026:
-        return True
-    if (night_start + dt.timedelta(days=1)).date() in NRW_HOLIDAYS_2026:
+    if weekday == 4 or weekday == 5:
         return True
-    return False
+    day = night_start.toordinal()
+    return day in _HOLIDAY_ORDINALS or day + 1 in _HOLIDAY_ORDINALS
 
 
 def decay(age_days: float, half_life_days: float) -> float:
@@ -142,7 +353,12 @@ def decay(age_days: float, half_life_days: float) -> float:
 
 
 def clamp_score(value: float) -> int:
-    return max(0, min(100, int(round(value))))
+    score = round(value)  # already an int for floats and ints
+    if score < 0:
+        return 0
+    if score > 100:
+        return 100
+    return score
 
 
 def ampel(score: int) -> str:
@@ -1,19 +1,27 @@
 import datetime as dt
+import functools
 import hashlib
 import hmac
+import http.client
 import json
 import os
+import re
 import secrets
+import threading
+import time
 import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import sqlite3
-from urllib.parse import parse_qs, urlencode, urlparse
-from urllib.request import Request, urlopen
+from urllib.parse import parse_qsl, urlencode, urlsplit
 
-from db import get_conn, init_db
+from db import checkpoint_wal, get_read_conn, get_thread_conn, init_db, write_transaction
 from score_engine import (
+    PointIndex,
     ampel,
+    bbox_around,
     clamp_score,
     classify_area,
     classify_road,
@@ -23,6 +31,7 @@ from score_engine import (
     night_window_for,
     score_area_modifier,
     spot_id_for,
+    unit_vector,
     weekend_or_holiday,
 )
 
@@ -31,6 +40,9 @@ PORT = 8787
 
 DEFAULT_SALT = "change-me-in-production"
 SERVER_SALT = os.environ.get("STAYSENSE_SERVER_SALT", DEFAULT_SALT)
+# Keyed once; hashed_device() copies the prepared HMAC state instead of redoing the key schedule per call.
+# Stored community_signal.hashed_device values depend on HMAC-SHA256 with this salt, so keep both.
+_DEVICE_HMAC = hmac.new(SERVER_SALT.encode("utf-8"), digestmod=hashlib.sha256)
 SIGNAL_COOLDOWN_HOURS = int(os.environ.get("STAYSENSE_SIGNAL_COOLDOWN_HOURS", "24"))
 NOMINATIM_BASE_URL = os.environ.get("STAYSENSE_NOMINATIM_BASE_URL", "https://nominatim.openstreetmap.org/search")
 NOMINATIM_USER_AGENT = os.environ.get(
@@ -38,14 +50,105 @@ NOMINATIM_USER_AGENT = os.environ.get(
     "StaySense/0.1 (staysense.vanityontour.de)",
 )
 OSM_TILE_BASE_URL = os.environ.get("STAYSENSE_OSM_TILE_BASE_URL", "https://tile.openstreetmap.org")
+TILE_PATH_RE = re.compile(r"/map/tile/(\d{1,2})/(\d{1,7})/(\d{1,7})\.png")
 ADMIN_SESSION_HOURS = int(os.environ.get("STAYSENSE_ADMIN_SESSION_HOURS", "12"))
 ADMIN_PBKDF2_ITERATIONS = int(os.environ.get("STAYSENSE_ADMIN_PBKDF2_ITERATIONS", "390000"))
 ADMIN_MANUAL_SOURCE = "admin_manual"
+# Every open connection holds a worker while it waits for its next request (up to KEEPALIVE_TIMEOUT_SECONDS),
+# so the pool must be well above the number of concurrent keep-alive connections (a browser opens ~6);
+# the workers mostly block on sockets, not the CPU.
+SERVER_WORKERS = int(os.environ.get("STAYSENSE_WORKERS", str(max(32, 4 * (os.cpu_count() or 1)))))
+KEEPALIVE_TIMEOUT_SECONDS = float(os.environ.get("STAYSENSE_KEEPALIVE_SECONDS", "1"))
+REQUEST_TIMEOUT_SECONDS = float(os.environ.get("STAYSENSE_REQUEST_TIMEOUT_SECONDS", "10"))
+MAX_DRAIN_BYTES = 1 << 20
+MAINTENANCE_INTERVAL_SECONDS = int(os.environ.get("STAYSENSE_MAINTENANCE_INTERVAL_SECONDS", "60"))
 
 FALLBACK_POLICE_POINTS = [(51.2507, 6.9751), (51.2965, 6.8494), (51.3398, 7.0438)]
 FALLBACK_FIRE_POINTS = [(51.2518, 6.9800), (51.2937, 6.8568), (51.3314, 7.0540)]
 FALLBACK_HOSPITAL_POINTS = [(51.2556, 6.9723), (51.2891, 6.8457), (51.3321, 7.0403)]
-ADMIN_SESSIONS: dict[str, dict] = {}
+FALLBACK_POLICE_INDEX = PointIndex(FALLBACK_POLICE_POINTS)
+FALLBACK_FIRE_INDEX = PointIndex(FALLBACK_FIRE_POINTS)
+FALLBACK_HOSPITAL_INDEX = PointIndex(FALLBACK_HOSPITAL_POINTS)
+# One shared encoder: json.dumps builds a new JSONEncoder per call whenever options are passed.
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=True, separators=(",", ":"))
+# Sessions live in admin_session (keyed by the token's SHA-256, never the token itself) so they survive
+# restarts; this process is their only writer, so validated sessions are also kept in memory.
+ADMIN_SESSION_CACHE_SIZE = 256
+_admin_session_cache_lock = threading.Lock()
+_admin_session_cache: OrderedDict[str, tuple[str, dt.datetime]] = OrderedDict()
+# Passwords that passed PBKDF2 recently are recognised by a keyed BLAKE2b digest instead. The key is random
+# per process and only successful logins are remembered, so guessing still pays the full PBKDF2 cost.
+ADMIN_LOGIN_CACHE_SECONDS = 300
+ADMIN_LOGIN_CACHE_SIZE = 64
+_login_cache_key = secrets.token_bytes(32)
+_login_cache_lock = threading.Lock()
+_login_cache: dict[bytes, tuple[str, float]] = {}
+# Sliding-window limit on /admin/login per client address, so password guessing is throttled before PBKDF2.
+ADMIN_LOGIN_RATE_LIMIT = int(os.environ.get("STAYSENSE_ADMIN_LOGIN_RATE_LIMIT", "5"))
+ADMIN_LOGIN_RATE_WINDOW_SECONDS = 60
+_login_attempts_lock = threading.Lock()
+_login_attempts: dict[str, deque[float]] = {}
+# Newest stored signal timestamp per (spot_id, hashed_device). Signals are never deleted, so a hit answers
+# the cooldown check without taking the write lock; misses (e.g. after a restart) fall through to SQLite.
+_latest_signal_lock = threading.Lock()
+_latest_signal: dict[tuple[str, str], str] = {}
+# The OSM importer runs as its own process and rewrites this state row in the same transaction as the
+# osm_* tables, so the row doubles as the version stamp of the in-memory OSM snapshot.
+OSM_SOURCE_NAME = "osm_overpass"
+OSM_TYPE_COLUMNS = {"osm_poi": "poi_type", "osm_zone": "zone_type", "osm_road": "road_type"}
+OSM_STAMP_SQL = "SELECT imported_at, record_count FROM data_source_state WHERE source_name = ?"
+_osm_cache_lock = threading.Lock()
+_osm_cache: dict = {"stamp": None, "indexes": None}
+LOCAL_EVENT_RADIUS_M = 1000
+LOCAL_EVENT_LABELS = {
+    "waste": "Müllabfuhr am Morgen",
+    "market": "Marktbetrieb am Morgen",
+    "event": "Lokale Veranstaltung",
+    "construction": "Baustelle",
+}
+LOCAL_EVENTS_SQL = """
+    SELECT event_type, risk_modifier, source, lat, lon, start_datetime, end_datetime
+    FROM open_data_event
+    WHERE start_datetime <= ?
+      AND end_datetime >= ?
+      AND lat BETWEEN ? AND ?
+      AND lon BETWEEN ? AND ?
+"""
+COMMUNITY_SIGNAL_BUCKETS = {
+    "knock": {"base": -25.0, "half_life": 10.0, "window": 30, "label": "Klopfen gemeldet"},
+    "noise": {"base": -15.0, "half_life": 7.0, "window": 14, "label": "Lärm gemeldet"},
+    "calm": {"base": 10.0, "half_life": 7.0, "window": 14, "label": "Ruhig gemeldet"},
+    "police": {"base": -18.0, "half_life": 10.0, "window": 30, "label": "Polizei-Einsatz gemeldet"},
+}
+# SQLite converts the stored ISO timestamps to epoch seconds, so rows need no datetime parsing in Python.
+COMMUNITY_SIGNALS_SQL = """
+    SELECT signal_type, CAST(strftime('%s', timestamp) AS INTEGER) AS ts_epoch
+    FROM community_signal
+    WHERE spot_id = ?
+      AND timestamp >= ?
+"""
+# data_source_state changes with imports and admin edits only; importers run out of process, so their
+# updates show up in /health and score metadata after at most this many seconds.
+DATA_SOURCE_CACHE_SECONDS = 30
+_data_source_cache: dict = {"rows": None, "expires": 0.0}
+# Spot rows are written once and never updated, so a resolved spot can be served from memory for good.
+SPOT_CACHE_SIZE = 4096
+_spot_cache_lock = threading.Lock()
+_spot_cache: OrderedDict[str, dict] = OrderedDict()
+# Upstream proxy responses. Tiles are kept as (body, etag, last_modified, fetched_at) and revalidated
+# with a conditional GET once stale; geocoder answers simply expire.
+TILE_CACHE_SIZE = int(os.environ.get("STAYSENSE_TILE_CACHE_SIZE", "4096"))
+TILE_CACHE_SECONDS = 43200
+GEOCODE_CACHE_SIZE = 1024
+GEOCODE_CACHE_SECONDS = 3600
+_proxy_cache_lock = threading.Lock()
+_tile_cache: OrderedDict[tuple[int, int, int], tuple[bytes, str | None, str | None, float]] = OrderedDict()
+_geocode_cache: OrderedDict[str, tuple[list, float]] = OrderedDict()
+# Idle keep-alive connections to the tile server and geocoder, keyed by (scheme, netloc).
+UPSTREAM_TIMEOUT_SECONDS = 5
+UPSTREAM_IDLE_PER_HOST = 16
+_upstream_lock = threading.Lock()
+_upstream_idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
 
 
 def utc_now() -> dt.datetime:
@@ -55,6 +158,12 @@ def utc_now() -> dt.datetime:
 def parse_iso8601(value: str | None) -> dt.datetime:
     if not value:
         return utc_now()
+    return _parse_iso8601_cached(value)
+
+
+# Stored timestamps (imported_at, event windows, signal times) recur across requests; datetimes are immutable.
+@functools.lru_cache(maxsize=4096)
+def _parse_iso8601_cached(value: str) -> dt.datetime:
     parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
     if parsed.tzinfo is None:
         return parsed.replace(tzinfo=dt.timezone.utc)
@@ -62,11 +171,14 @@ def parse_iso8601(value: str | None) -> dt.datetime:
 
 
 def to_iso(value: dt.datetime) -> str:
+    if value.tzinfo is dt.timezone.utc:
+        # Common case (utc_now() and parsed values); skips the astimezone/replace copies.
+        return value.isoformat(timespec="seconds")[:19] + "Z"
     return value.astimezone(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
 def json_response(handler: BaseHTTPRequestHandler, status: int, payload: dict) -> None:
-    raw = json.dumps(payload, ensure_ascii=True).encode("utf-8")
+    raw = _JSON_ENCODER.encode(payload).encode("ascii")
     handler.send_response(status)
     handler.send_header("Content-Type", "application/json; charset=utf-8")
     handler.send_header("Content-Length", str(len(raw)))
@@ -91,6 +203,7 @@ def read_json(handler: BaseHTTPRequestHandler) -> dict:
     if length <= 0:
         return {}
     body = handler.rfile.read(length)
+    handler.body_consumed = True
     return json.loads(body.decode("utf-8"))
 
 
@@ -103,11 +216,9 @@ def require_fields(handler: BaseHTTPRequestHandler, body: dict, fields: list[str
 
 
 def hashed_device(device_token: str) -> str:
-    return hmac.new(
-        key=SERVER_SALT.encode("utf-8"),
-        msg=device_token.encode("utf-8"),
-        digestmod=hashlib.sha256,
-    ).hexdigest()
+    digest = _DEVICE_HMAC.copy()
+    digest.update(device_token.encode("utf-8"))
+    return digest.hexdigest()
 
 
 def pbkdf2_hash(password: str, salt_hex: str) -> str:
@@ -121,14 +232,35 @@ def pbkdf2_hash(password: str, salt_hex: str) -> str:
     return dk.hex()
 
 
+def verify_admin_password(admin: dict, password: str) -> bool:
+    fingerprint = hashlib.blake2b(
+        bytes.fromhex(admin["password_salt"]) + password.encode("utf-8"), key=_login_cache_key
+    ).digest()
+    now = time.monotonic()
+    with _login_cache_lock:
+        cached = _login_cache.get(fingerprint)
+    if cached and cached[1] > now and hmac.compare_digest(cached[0], admin["password_hash"]):
+        return True
+
+    expected = pbkdf2_hash(password, admin["password_salt"])
+    if not hmac.compare_digest(expected, admin["password_hash"]):
+        return False
+    with _login_cache_lock:
+        for key in [key for key, (_, expires) in _login_cache.items() if expires <= now]:
+            del _login_cache[key]
+        if len(_login_cache) < ADMIN_LOGIN_CACHE_SIZE:
+            _login_cache[fingerprint] = (admin["password_hash"], now + ADMIN_LOGIN_CACHE_SECONDS)
+    return True
+
+
 def admin_exists() -> bool:
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("SELECT 1 FROM admin_user WHERE id = 1").fetchone()
     return bool(row)
 
 
 def get_admin_user() -> dict | None:
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         row = conn.execute("SELECT id, username, password_hash, password_salt FROM admin_user WHERE id = 1").fetchone()
     return dict(row) if row else None
 
@@ -151,7 +283,7 @@ def create_admin_user(username: str, password: str) -> tuple[bool, str]:
     username_clean = username.strip()
     salt_hex = secrets.token_hex(16)
     pw_hash = pbkdf2_hash(password, salt_hex)
-    with get_conn() as conn:
+    with get_thread_conn() as conn:
         conn.execute(
             """
             INSERT INTO admin_user (id, username, password_hash, password_salt, created_at, updated_at)
@@ -162,36 +294,78 @@ def create_admin_user(username: str, password: str) -> tuple[bool, str]:
     return True, "created"
 
 
+def client_ip(handler: BaseHTTPRequestHandler) -> str:
+    host = handler.client_address[0]
+    forwarded = handler.headers.get("X-Forwarded-For")
+    if forwarded and host in ("127.0.0.1", "::1"):
+        # Behind nginx: the last entry is the peer nginx saw; anything before it is client-supplied.
+        return forwarded.rsplit(",", 1)[-1].strip()
+    return host
+
+
+def login_rate_limited(address: str) -> bool:
+    now = time.monotonic()
+    with _login_attempts_lock:
+        attempts = _login_attempts.setdefault(address, deque())
+        while attempts and attempts[0] <= now - ADMIN_LOGIN_RATE_WINDOW_SECONDS:
+            attempts.popleft()
+        if len(attempts) >= ADMIN_LOGIN_RATE_LIMIT:
+            return True
+        attempts.append(now)
+    return False
+
+
+def session_token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def create_admin_session(username: str) -> dict:
     token = secrets.token_urlsafe(32)
-    expires_at = utc_now() + dt.timedelta(hours=ADMIN_SESSION_HOURS)
-    ADMIN_SESSIONS[token] = {
-        "username": username,
-        "expires_at": expires_at,
-    }
+    now = utc_now()
+    expires_at = now + dt.timedelta(hours=ADMIN_SESSION_HOURS)
+    with get_thread_conn() as conn:
+        conn.execute(
+            "INSERT INTO admin_session (token_hash, username, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (session_token_hash(token), username, to_iso(now), to_iso(expires_at)),
+        )
     return {"token": token, "expires_at": to_iso(expires_at), "session_hours": ADMIN_SESSION_HOURS}
 
 
-def cleanup_admin_sessions() -> None:
-    now = utc_now()
-    expired = [token for token, item in ADMIN_SESSIONS.items() if item["expires_at"] <= now]
-    for token in expired:
-        ADMIN_SESSIONS.pop(token, None)
+def delete_admin_session(token: str) -> None:
+    token_hash = session_token_hash(token)
+    with _admin_session_cache_lock:
+        _admin_session_cache.pop(token_hash, None)
+    with get_thread_conn() as conn:
+        conn.execute("DELETE FROM admin_session WHERE token_hash = ?", (token_hash,))
 
 
 def admin_auth(handler: BaseHTTPRequestHandler) -> tuple[bool, str]:
-    cleanup_admin_sessions()
     auth_header = handler.headers.get("Authorization", "")
     if not auth_header.startswith("Bearer "):
         return False, "missing_token"
-    token = auth_header.replace("Bearer ", "", 1).strip()
-    session = ADMIN_SESSIONS.get(token)
-    if not session:
-        return False, "invalid_token"
-    if session["expires_at"] <= utc_now():
-        ADMIN_SESSIONS.pop(token, None)
+    token_hash = session_token_hash(auth_header.replace("Bearer ", "", 1).strip())
+    with _admin_session_cache_lock:
+        session = _admin_session_cache.get(token_hash)
+        if session is not None:
+            _admin_session_cache.move_to_end(token_hash)
+    if session is None:
+        with get_read_conn() as conn:
+            row = conn.execute(
+                "SELECT username, expires_at FROM admin_session WHERE token_hash = ?", (token_hash,)
+            ).fetchone()
+        if not row:
+            return False, "invalid_token"
+        session = (row["username"], parse_iso8601(row["expires_at"]))
+        with _admin_session_cache_lock:
+            _admin_session_cache[token_hash] = session
+            while len(_admin_session_cache) > ADMIN_SESSION_CACHE_SIZE:
+                _admin_session_cache.popitem(last=False)
+    username, expires_at = session
+    if expires_at <= utc_now():
+        with _admin_session_cache_lock:
+            _admin_session_cache.pop(token_hash, None)
         return False, "expired_token"
-    return True, session["username"]
+    return True, username
 
 
 def parse_admin_event(body: dict) -> tuple[dict | None, str | None]:
@@ -225,76 +399,93 @@ def parse_admin_event(body: dict) -> tuple[dict | None, str | None]:
     }, None
 
 
-def fetch_points(sql: str, params: tuple) -> list[tuple[float, float]]:
-    with get_conn() as conn:
-        rows = conn.execute(sql, params).fetchall()
-    return [(float(r["lat"]), float(r["lon"])) for r in rows]
+def load_osm_indexes(conn: sqlite3.Connection) -> dict[tuple[str, str | None], PointIndex]:
+    # One pass per table: zones and roads become a single index labeled by type, POIs one index per type.
+    indexes = {}
+    for table in ("osm_zone", "osm_road"):
+        rows = conn.execute(f"SELECT lat, lon, {OSM_TYPE_COLUMNS[table]} FROM {table}").fetchall()
+        indexes[(table, None)] = PointIndex([(r[0], r[1]) for r in rows], labels=[r[2] for r in rows])
+    poi_points: dict[str, list[tuple[float, float]]] = {}
+    for poi_type, lat, lon in conn.execute("SELECT poi_type, lat, lon FROM osm_poi"):
+        poi_points.setdefault(poi_type, []).append((lat, lon))
+    for poi_type, points in poi_points.items():
+        indexes[("osm_poi", poi_type)] = PointIndex(points)
+    return indexes
+
+
+def osm_indexes() -> dict[tuple[str, str | None], PointIndex]:
+    """KD-trees over the osm_* tables keyed by (table, type), with type None for a table's labeled index.
+
+    Rebuilt once after each OSM import and shared across requests.
+    """
+    with get_read_conn() as conn:
+        row = conn.execute(OSM_STAMP_SQL, (OSM_SOURCE_NAME,)).fetchone()
+        stamp = tuple(row) if row else None
+        with _osm_cache_lock:
+            if _osm_cache["stamp"] != stamp or _osm_cache["indexes"] is None:
+                _osm_cache["indexes"] = load_osm_indexes(conn)
+                _osm_cache["stamp"] = stamp
+            return _osm_cache["indexes"]
 
 
 def nearest_from_db(
-    lat: float, lon: float, table: str, type_col: str, value: str, fallback_points: list[tuple[float, float]]
+    lat: float, lon: float, indexes: dict, poi_type: str, fallback_points: PointIndex
 ) -> tuple[int, bool]:
-    rows = fetch_points(
-        f"SELECT lat, lon FROM {table} WHERE {type_col} = ?",
-        (value,),
-    )
-    if rows:
-        return int(min(haversine_m(lat, lon, x, y) for x, y in rows)), False
+    index = indexes.get(("osm_poi", poi_type))
+    if index:
+        return int(index.nearest_distance_m(lat, lon)), False
     if fallback_points:
         return nearest_distance_m(lat, lon, fallback_points), True
     return 5000, True
 
 
-def area_from_db(lat: float, lon: float) -> str:
-    with get_conn() as conn:
-        rows = conn.execute("SELECT zone_type, lat, lon FROM osm_zone").fetchall()
-
-    if not rows:
+def area_from_db(lat: float, lon: float, indexes: dict) -> str:
+    index = indexes.get(("osm_zone", None))
+    if not index:
         return classify_area(lat, lon)
-
-    best_type = "residential"
-    best_dist = 999999.0
-    for row in rows:
-        dist = haversine_m(lat, lon, float(row["lat"]), float(row["lon"]))
-        if dist < best_dist:
-            best_dist = dist
-            best_type = row["zone_type"]
-
-    return best_type if best_dist <= 500 else "residential"
+    nearest = index.nearest_within(unit_vector(lat, lon), 500)
+    return nearest[0] if nearest else "residential"
 
 
-def road_from_db(lat: float, lon: float) -> str:
-    with get_conn() as conn:
-        rows = conn.execute("SELECT road_type, lat, lon FROM osm_road").fetchall()
-
-    if not rows:
+def road_from_db(lat: float, lon: float, indexes: dict) -> str:
+    index = indexes.get(("osm_road", None))
+    if not index:
         return classify_road(lat, lon)
+    nearest = index.nearest_within(unit_vector(lat, lon), 300)
+    return nearest[0] if nearest else "unknown"
 
-    best_type = "unknown"
-    best_dist = 999999.0
-    for row in rows:
-        dist = haversine_m(lat, lon, float(row["lat"]), float(row["lon"]))
-        if dist < best_dist:
-            best_dist = dist
-            best_type = row["road_type"]
 
-    return best_type if best_dist <= 300 else "unknown"
+def remember_spot(spot: dict) -> dict:
+    with _spot_cache_lock:
+        _spot_cache[spot["id"]] = spot
+        _spot_cache.move_to_end(spot["id"])
+        while len(_spot_cache) > SPOT_CACHE_SIZE:
+            _spot_cache.popitem(last=False)
+    return spot
 
 
 def ensure_spot(lat: float, lon: float, now_iso: str) -> dict:
     s_id = spot_id_for(lat, lon)
-    with get_conn() as conn:
+    with _spot_cache_lock:
+        cached = _spot_cache.get(s_id)
+        if cached is not None:
+            _spot_cache.move_to_end(s_id)
+            return cached
+    # Known spots are served from the read pool; a write connection is only opened to insert a new one.
+    with get_read_conn() as conn:
         row = conn.execute("SELECT * FROM spot WHERE id = ?", (s_id,)).fetchone()
-        if row:
-            return dict(row)
+    if row:
+        return remember_spot(dict(row))
 
-        area_type = area_from_db(lat, lon)
-        road_type = road_from_db(lat, lon)
+    indexes = osm_indexes()
+    area_type = area_from_db(lat, lon, indexes)
+    road_type = road_from_db(lat, lon, indexes)
 
-        police_d, police_fallback = nearest_from_db(lat, lon, "osm_poi", "poi_type", "police", FALLBACK_POLICE_POINTS)
-        fire_d, fire_fallback = nearest_from_db(lat, lon, "osm_poi", "poi_type", "fire", FALLBACK_FIRE_POINTS)
-        hosp_d, hosp_fallback = nearest_from_db(lat, lon, "osm_poi", "poi_type", "hospital", FALLBACK_HOSPITAL_POINTS)
+    police_d, police_fallback = nearest_from_db(lat, lon, indexes, "police", FALLBACK_POLICE_INDEX)
+    fire_d, fire_fallback = nearest_from_db(lat, lon, indexes, "fire", FALLBACK_FIRE_INDEX)
+    hosp_d, hosp_fallback = nearest_from_db(lat, lon, indexes, "hospital", FALLBACK_HOSPITAL_INDEX)
 
+    with get_thread_conn() as conn:
         try:
             conn.execute(
                 """
@@ -310,7 +501,7 @@ def ensure_spot(lat: float, lon: float, now_iso: str) -> dict:
             # Concurrent request may have inserted the same spot id meanwhile.
             existing = conn.execute("SELECT * FROM spot WHERE id = ?", (s_id,)).fetchone()
             if existing:
-                return dict(existing)
+                return remember_spot(dict(existing))
             raise
         except sqlite3.OperationalError:
             # Read-only DB deployments can still serve scores without persisting spot cache.
@@ -326,55 +517,51 @@ def ensure_spot(lat: float, lon: float, now_iso: str) -> dict:
                 "used_fallback_pois": police_fallback or fire_fallback or hosp_fallback,
             }
 
-        return {
-            "id": s_id,
-            "lat": lat,
-            "lon": lon,
-            "osm_area_type": area_type,
-            "road_type": road_type,
-            "distance_police_m": police_d,
-            "distance_fire_m": fire_d,
-            "distance_hospital_m": hosp_d,
-            "used_fallback_pois": police_fallback or fire_fallback or hosp_fallback,
-        }
+        # Cache the row as a later SELECT would return it; the fallback flag only applies to this response.
+        row = remember_spot(
+            {
+                "id": s_id,
+                "lat": lat,
+                "lon": lon,
+                "osm_area_type": area_type,
+                "road_type": road_type,
+                "distance_police_m": police_d,
+                "distance_fire_m": fire_d,
+                "distance_hospital_m": hosp_d,
+                "created_at": now_iso,
+                "updated_at": now_iso,
+            }
+        )
+        return {**row, "used_fallback_pois": police_fallback or fire_fallback or hosp_fallback}
 
 
 def collect_local_event_factors(lat: float, lon: float, night_end: dt.datetime) -> list[dict]:
     next_morning_start = night_end
     next_morning_end = night_end + dt.timedelta(hours=4)
+    # The padded box only has to contain the radius; the exact distance check below still decides.
+    min_lat, max_lat, min_lon, max_lon = bbox_around(lat, lon, LOCAL_EVENT_RADIUS_M * 1.01)
 
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         rows = conn.execute(
-            """
-            SELECT event_type, risk_modifier, source, lat, lon, start_datetime, end_datetime
-            FROM open_data_event
-            WHERE start_datetime <= ?
-              AND end_datetime >= ?
-            """,
-            (to_iso(next_morning_end), to_iso(next_morning_start)),
+            LOCAL_EVENTS_SQL,
+            (to_iso(next_morning_end), to_iso(next_morning_start), min_lat, max_lat, min_lon, max_lon),
         ).fetchall()
 
     factors = []
     seen = set()
-    for row in rows:
-        distance = haversine_m(lat, lon, float(row["lat"]), float(row["lon"]))
-        if distance > 1000:
+    for event_type, risk_modifier, source, event_lat, event_lon, start_datetime, end_datetime in rows:
+        event_lat = float(event_lat)
+        event_lon = float(event_lon)
+        if haversine_m(lat, lon, event_lat, event_lon) > LOCAL_EVENT_RADIUS_M:
             continue
 
-        event_type = row["event_type"]
-        label = {
-            "waste": "Müllabfuhr am Morgen",
-            "market": "Marktbetrieb am Morgen",
-            "event": "Lokale Veranstaltung",
-            "construction": "Baustelle",
-        }.get(event_type, "Lokales Ereignis")
         dedupe_key = (
             event_type,
-            row["risk_modifier"],
-            row["start_datetime"] if "start_datetime" in row.keys() else "",
-            row["end_datetime"] if "end_datetime" in row.keys() else "",
-            round(float(row["lat"]), 4),
-            round(float(row["lon"]), 4),
+            risk_modifier,
+            start_datetime,
+            end_datetime,
+            round(event_lat, 4),
+            round(event_lon, 4),
         )
         if dedupe_key in seen:
             continue
@@ -383,9 +570,9 @@ def collect_local_event_factors(lat: float, lon: float, night_end: dt.datetime)
         factors.append(
             {
                 "key": f"event_{event_type}",
-                "label": label,
-                "points": float(row["risk_modifier"]),
-                "source": row["source"],
+                "label": LOCAL_EVENT_LABELS.get(event_type, "Lokales Ereignis"),
+                "points": float(risk_modifier),
+                "source": source,
             }
         )
     return factors
@@ -393,32 +580,17 @@ def collect_local_event_factors(lat: float, lon: float, night_end: dt.datetime)
 
 def collect_community_factors(spot_id: str, at_time: dt.datetime) -> list[dict]:
     max_window = at_time - dt.timedelta(days=30)
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT signal_type, timestamp
-            FROM community_signal
-            WHERE spot_id = ?
-              AND timestamp >= ?
-            """,
-            (spot_id, to_iso(max_window)),
-        ).fetchall()
-
-    buckets = {
-        "knock": {"base": -25.0, "half_life": 10.0, "window": 30, "label": "Klopfen gemeldet"},
-        "noise": {"base": -15.0, "half_life": 7.0, "window": 14, "label": "Lärm gemeldet"},
-        "calm": {"base": 10.0, "half_life": 7.0, "window": 14, "label": "Ruhig gemeldet"},
-        "police": {"base": -18.0, "half_life": 10.0, "window": 30, "label": "Polizei-Einsatz gemeldet"},
-    }
-
-    by_type: dict[str, float] = {key: 0.0 for key in buckets}
-    for row in rows:
-        signal_type = row["signal_type"]
-        if signal_type not in buckets:
+    at_epoch = at_time.timestamp()
+    with get_read_conn() as conn:
+        rows = conn.execute(COMMUNITY_SIGNALS_SQL, (spot_id, to_iso(max_window))).fetchall()
+
+    buckets = COMMUNITY_SIGNAL_BUCKETS
+    by_type: dict[str, float] = dict.fromkeys(buckets, 0.0)
+    for signal_type, ts_epoch in rows:
+        cfg = buckets.get(signal_type)
+        if cfg is None or ts_epoch is None:
             continue
-        cfg = buckets[signal_type]
-        sig_ts = parse_iso8601(row["timestamp"])
-        age_days = max(0.0, (at_time - sig_ts).total_seconds() / 86400.0)
+        age_days = (at_epoch - ts_epoch) / 86400.0
         if age_days > cfg["window"]:
             continue
         by_type[signal_type] += cfg["base"] * decay(age_days, cfg["half_life"])
@@ -440,34 +612,46 @@ def collect_community_factors(spot_id: str, at_time: dt.datetime) -> list[dict]:
 
 
 def data_source_meta() -> list[dict]:
-    with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT source_name, imported_at, record_count, notes FROM data_source_state ORDER BY imported_at DESC"
-        ).fetchall()
+    now = time.monotonic()
+    rows = _data_source_cache["rows"]
+    if rows is None or _data_source_cache["expires"] <= now:
+        with get_read_conn() as conn:
+            rows = [
+                dict(row)
+                for row in conn.execute(
+                    "SELECT source_name, imported_at, record_count, notes FROM data_source_state ORDER BY imported_at DESC"
+                )
+            ]
+        _data_source_cache["rows"] = rows
+        _data_source_cache["expires"] = now + DATA_SOURCE_CACHE_SECONDS
     return [dict(row) for row in rows]
 
 
-def source_health(sources: list[dict], now: dt.datetime) -> dict:
-    if not sources:
-        return {"freshest_age_hours": None, "stalest_age_hours": None, "stale_sources": [], "has_data": False}
+def invalidate_data_source_meta() -> None:
+    _data_source_cache["expires"] = 0.0
 
-    ages = []
+
+def source_health(sources: list[dict], now: dt.datetime) -> dict:
+    freshest = stalest = None
     stale_sources = []
     for src in sources:
         try:
             age_h = (now - parse_iso8601(src["imported_at"])).total_seconds() / 3600.0
         except Exception:
             continue
-        age_h = max(0.0, age_h)
-        ages.append((src["source_name"], age_h))
+        if age_h < 0.0:
+            age_h = 0.0
+        if freshest is None:
+            freshest = stalest = age_h
+        elif age_h < freshest:
+            freshest = age_h
+        elif age_h > stalest:
+            stalest = age_h
         if age_h > 24:
             stale_sources.append(src["source_name"])
 
-    if not ages:
+    if freshest is None:
         return {"freshest_age_hours": None, "stalest_age_hours": None, "stale_sources": [], "has_data": False}
-
-    freshest = min(age for _, age in ages)
-    stalest = max(age for _, age in ages)
     return {
         "freshest_age_hours": round(freshest, 2),
         "stalest_age_hours": round(stalest, 2),
@@ -568,11 +752,17 @@ def build_explanation(factors: list[dict], spot: dict) -> dict:
     }
 
 
-def compute_score_payload(lat: float, lon: float, at_time: dt.datetime) -> dict:
-    now_iso = to_iso(utc_now())
+def compute_score_payload(lat: float, lon: float, at_time: dt.datetime, now: dt.datetime) -> dict:
+    # All reads below share one pooled connection (nested get_read_conn() calls reuse it).
+    with get_read_conn():
+        return _compute_score_payload(lat, lon, at_time, now)
+
+
+def _compute_score_payload(lat: float, lon: float, at_time: dt.datetime, now: dt.datetime) -> dict:
+    now_iso = to_iso(now)
     spot = ensure_spot(lat, lon, now_iso)
     sources = data_source_meta()
-    health = source_health(sources, utc_now())
+    health = source_health(sources, now)
 
     night_start, night_end = night_window_for(at_time)
     factors = []
@@ -630,13 +820,15 @@ def compute_score_payload(lat: float, lon: float, at_time: dt.datetime) -> dict:
     }
 
 
-def compute_score_payload_fallback(lat: float, lon: float, at_time: dt.datetime, error_code: str) -> dict:
+def compute_score_payload_fallback(
+    lat: float, lon: float, at_time: dt.datetime, now: dt.datetime, error_code: str
+) -> dict:
     night_start, night_end = night_window_for(at_time)
     factors: list[dict] = []
 
-    police_d = nearest_distance_m(lat, lon, FALLBACK_POLICE_POINTS)
-    fire_d = nearest_distance_m(lat, lon, FALLBACK_FIRE_POINTS)
-    hosp_d = nearest_distance_m(lat, lon, FALLBACK_HOSPITAL_POINTS)
+    police_d = nearest_distance_m(lat, lon, FALLBACK_POLICE_INDEX)
+    fire_d = nearest_distance_m(lat, lon, FALLBACK_FIRE_INDEX)
+    hosp_d = nearest_distance_m(lat, lon, FALLBACK_HOSPITAL_INDEX)
 
     if police_d < 200:
         factors.append({"key": "dist_police", "label": "Polizei in <200m", "points": -15.0, "source": "fallback"})
@@ -683,7 +875,7 @@ def compute_score_payload_fallback(lat: float, lon: float, at_time: dt.datetime,
             "end": to_iso(night_end),
         },
         "meta": {
-            "data_updated_at": to_iso(utc_now()),
+            "data_updated_at": to_iso(now),
             "region": "DE-NW (Pilot: Kreis Mettmann)",
             "attribution": "Kartendaten: OpenStreetMap-Mitwirkende (ODbL)",
             "sources": [],
@@ -696,11 +888,12 @@ def compute_score_payload_fallback(lat: float, lon: float, at_time: dt.datetime,
     }
 
 
-def handle_score(handler: BaseHTTPRequestHandler, query: dict[str, list[str]]) -> None:
+def handle_score(handler: BaseHTTPRequestHandler, query: dict[str, str]) -> None:
+    now = utc_now()
     try:
-        lat = float(query.get("lat", [""])[0])
-        lon = float(query.get("lon", [""])[0])
-        at = parse_iso8601(query.get("at", [""])[0])
+        lat = float(query.get("lat", ""))
+        lon = float(query.get("lon", ""))
+        at = parse_iso8601(query["at"]) if query.get("at") else now
     except Exception:
         json_response(handler, HTTPStatus.BAD_REQUEST, {"error": "invalid_query"})
         return
@@ -711,12 +904,24 @@ def handle_score(handler: BaseHTTPRequestHandler, query: dict[str, list[str]]) -
         return
 
     try:
-        payload = compute_score_payload(lat, lon, at)
+        payload = compute_score_payload(lat, lon, at, now)
     except Exception:
-        payload = compute_score_payload_fallback(lat, lon, at, "score_engine_error")
+        payload = compute_score_payload_fallback(lat, lon, at, now, "score_engine_error")
     json_response(handler, HTTPStatus.OK, payload)
 
 
+def cooldown_rejection(latest_iso: str) -> tuple[int, dict]:
+    next_allowed = parse_iso8601(latest_iso) + dt.timedelta(hours=SIGNAL_COOLDOWN_HOURS)
+    return (
+        HTTPStatus.TOO_MANY_REQUESTS,
+        {
+            "accepted": False,
+            "error": "cooldown_active",
+            "next_allowed_at": to_iso(next_allowed),
+        },
+    )
+
+
 def handle_signal(handler: BaseHTTPRequestHandler) -> None:
     try:
         body = read_json(handler)
@@ -744,67 +949,74 @@ def handle_signal(handler: BaseHTTPRequestHandler) -> None:
     if timestamp > now + dt.timedelta(minutes=5):
         timestamp = now
 
-    cooldown_start = timestamp - dt.timedelta(hours=SIGNAL_COOLDOWN_HOURS)
+    cooldown_start_iso = to_iso(timestamp - dt.timedelta(hours=SIGNAL_COOLDOWN_HOURS))
+    key = (spot_id, hashed)
+    with _latest_signal_lock:
+        latest_iso = _latest_signal.get(key)
+    if latest_iso is not None and latest_iso >= cooldown_start_iso:
+        json_response(handler, *cooldown_rejection(latest_iso))
+        return
 
-    with get_conn() as conn:
+    # The cooldown check and the insert share one BEGIN IMMEDIATE transaction, so concurrent signals from
+    # the same device serialize on the write lock instead of both passing the check.
+    rejection = None
+    with write_transaction(get_thread_conn()) as conn:
         spot_exists = conn.execute("SELECT 1 FROM spot WHERE id = ?", (spot_id,)).fetchone()
+        latest = None
+        if spot_exists:
+            latest = conn.execute(
+                """
+                SELECT timestamp
+                FROM community_signal
+                WHERE spot_id = ?
+                  AND hashed_device = ?
+                  AND timestamp >= ?
+                ORDER BY timestamp DESC
+                LIMIT 1
+                """,
+                (spot_id, hashed, cooldown_start_iso),
+            ).fetchone()
+
         if not spot_exists:
-            json_response(handler, HTTPStatus.BAD_REQUEST, {"error": "unknown_spot_id"})
-            return
+            rejection = (HTTPStatus.BAD_REQUEST, {"error": "unknown_spot_id"})
+        elif latest:
+            latest_iso = latest["timestamp"]
+            rejection = cooldown_rejection(latest_iso)
+        else:
+            day_bucket = timestamp.date().isoformat()
+            try:
+                conn.execute(
+                    """
+                    INSERT INTO community_signal (
+                        id, spot_id, signal_type, hashed_device, timestamp, day_bucket
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        str(uuid.uuid4()),
+                        spot_id,
+                        signal_type,
+                        hashed,
+                        to_iso(timestamp),
+                        day_bucket,
+                    ),
+                )
+                latest_iso = to_iso(timestamp)
+            except sqlite3.IntegrityError:
+                rejection = (
+                    HTTPStatus.TOO_MANY_REQUESTS,
+                    {
+                        "accepted": False,
+                        "error": "daily_limit",
+                    },
+                )
 
-        latest = conn.execute(
-            """
-            SELECT timestamp
-            FROM community_signal
-            WHERE spot_id = ?
-              AND hashed_device = ?
-              AND timestamp >= ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-            """,
-            (spot_id, hashed, to_iso(cooldown_start)),
-        ).fetchone()
-
-        if latest:
-            next_allowed = parse_iso8601(latest["timestamp"]) + dt.timedelta(hours=SIGNAL_COOLDOWN_HOURS)
-            json_response(
-                handler,
-                HTTPStatus.TOO_MANY_REQUESTS,
-                {
-                    "accepted": False,
-                    "error": "cooldown_active",
-                    "next_allowed_at": to_iso(next_allowed),
-                },
-            )
-            return
+    if latest_iso is not None:
+        with _latest_signal_lock:
+            _latest_signal[key] = latest_iso
 
-        day_bucket = timestamp.date().isoformat()
-        try:
-            conn.execute(
-                """
-                INSERT INTO community_signal (
-                    id, spot_id, signal_type, hashed_device, timestamp, day_bucket
-                ) VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    str(uuid.uuid4()),
-                    spot_id,
-                    signal_type,
-                    hashed,
-                    to_iso(timestamp),
-                    day_bucket,
-                ),
-            )
-        except Exception:
-            json_response(
-                handler,
-                HTTPStatus.TOO_MANY_REQUESTS,
-                {
-                    "accepted": False,
-                    "error": "daily_limit",
-                },
-            )
-            return
+    if rejection:
+        json_response(handler, *rejection)
+        return
 
     json_response(
         handler,
@@ -816,8 +1028,98 @@ def handle_signal(handler: BaseHTTPRequestHandler) -> None:
     )
 
 
-def handle_geocode_search(handler: BaseHTTPRequestHandler, query: dict[str, list[str]]) -> None:
-    raw_q = (query.get("q") or [""])[0].strip()
+def proxy_cache_get(cache: OrderedDict, key):
+    with _proxy_cache_lock:
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+    return entry
+
+
+def proxy_cache_put(cache: OrderedDict, key, entry, max_size: int) -> None:
+    with _proxy_cache_lock:
+        cache[key] = entry
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+
+def upstream_get(url: str, headers: dict[str, str]) -> tuple[int, http.client.HTTPMessage, bytes]:
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    target = f"{parts.path or '/'}?{parts.query}" if parts.query else parts.path or "/"
+    for attempt in range(2):
+        conn = None
+        if attempt == 0:
+            with _upstream_lock:
+                idle = _upstream_idle.get(key)
+                if idle:
+                    conn = idle.pop()
+        reused = conn is not None
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+            conn = conn_class(parts.netloc, timeout=UPSTREAM_TIMEOUT_SECONDS)
+        try:
+            conn.request("GET", target, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except ConnectionError:
+            conn.close()
+            # The upstream may have dropped an idle keep-alive connection; retry once on a fresh one.
+            if reused:
+                continue
+            raise
+        except Exception:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            with _upstream_lock:
+                idle = _upstream_idle.setdefault(key, [])
+                if len(idle) < UPSTREAM_IDLE_PER_HOST:
+                    idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        return response.status, response.headers, body
+    raise ConnectionError("upstream_unavailable")
+
+
+def fetch_tile(z: int, x: int, y: int) -> bytes:
+    key = (z, x, y)
+    now = time.monotonic()
+    cached = proxy_cache_get(_tile_cache, key)
+    if cached and now - cached[3] < TILE_CACHE_SECONDS:
+        return cached[0]
+
+    headers = {"User-Agent": NOMINATIM_USER_AGENT, "Accept": "image/png"}
+    if cached:
+        if cached[1]:
+            headers["If-None-Match"] = cached[1]
+        if cached[2]:
+            headers["If-Modified-Since"] = cached[2]
+    try:
+        status, response_headers, body = upstream_get(f"{OSM_TILE_BASE_URL}/{z}/{x}/{y}.png", headers)
+        if status == HTTPStatus.NOT_MODIFIED and cached is not None:
+            entry = (cached[0], cached[1], cached[2], now)
+        elif status == HTTPStatus.OK:
+            entry = (body, response_headers.get("ETag"), response_headers.get("Last-Modified"), now)
+        else:
+            raise RuntimeError("tile_status")
+    except Exception:
+        # A stale tile beats a broken map while the tile server is unreachable.
+        if cached is None:
+            raise
+        return cached[0]
+
+    proxy_cache_put(_tile_cache, key, entry, TILE_CACHE_SIZE)
+    return entry[0]
+
+
+def handle_geocode_search(handler: BaseHTTPRequestHandler, query: dict[str, str]) -> None:
+    raw_q = query.get("q", "").strip()
     if len(raw_q) < 2:
         json_response(handler, HTTPStatus.BAD_REQUEST, {"error": "query_too_short"})
         return
@@ -825,6 +1127,12 @@ def handle_geocode_search(handler: BaseHTTPRequestHandler, query: dict[str, list
         json_response(handler, HTTPStatus.BAD_REQUEST, {"error": "query_too_long"})
         return
 
+    cache_key = " ".join(raw_q.lower().split())
+    cached = proxy_cache_get(_geocode_cache, cache_key)
+    if cached and time.monotonic() - cached[1] < GEOCODE_CACHE_SECONDS:
+        json_response(handler, HTTPStatus.OK, {"results": cached[0]})
+        return
+
     params = urlencode(
         {
             "q": raw_q,
@@ -834,20 +1142,16 @@ def handle_geocode_search(handler: BaseHTTPRequestHandler, query: dict[str, list
             "countrycodes": "de",
         }
     )
-    request = Request(
-        f"{NOMINATIM_BASE_URL}?{params}",
-        headers={
-            "User-Agent": NOMINATIM_USER_AGENT,
-            "Accept": "application/json",
-        },
-    )
+    headers = {
+        "User-Agent": NOMINATIM_USER_AGENT,
+        "Accept": "application/json",
+    }
 
     try:
-        with urlopen(request, timeout=5) as response:
-            if response.status != 200:
-                raise RuntimeError("nominatim_status")
-            raw = response.read().decode("utf-8")
-            data = json.loads(raw)
+        status, _, raw = upstream_get(f"{NOMINATIM_BASE_URL}?{params}", headers)
+        if status != 200:
+            raise RuntimeError("nominatim_status")
+        data = json.loads(raw.decode("utf-8"))
     except Exception:
         json_response(handler, HTTPStatus.BAD_GATEWAY, {"error": "geocoder_unavailable"})
         return
@@ -869,27 +1173,16 @@ def handle_geocode_search(handler: BaseHTTPRequestHandler, query: dict[str, list
             }
         )
 
+    proxy_cache_put(_geocode_cache, cache_key, (results, time.monotonic()), GEOCODE_CACHE_SIZE)
     json_response(handler, HTTPStatus.OK, {"results": results})
 
 
 def handle_tile_proxy(handler: BaseHTTPRequestHandler, path: str) -> None:
-    parts = path.strip("/").split("/")
-    if len(parts) != 5 or parts[0] != "map" or parts[1] != "tile":
-        json_response(handler, HTTPStatus.NOT_FOUND, {"error": "not_found"})
-        return
-
-    z_raw, x_raw, y_raw = parts[2], parts[3], parts[4]
-    if not y_raw.endswith(".png"):
-        json_response(handler, HTTPStatus.BAD_REQUEST, {"error": "invalid_tile_path"})
-        return
-
-    try:
-        z = int(z_raw)
-        x = int(x_raw)
-        y = int(y_raw[:-4])
-    except Exception:
+    match = TILE_PATH_RE.fullmatch(path)
+    if match is None:
         json_response(handler, HTTPStatus.BAD_REQUEST, {"error": "invalid_tile_path"})
         return
+    z, x, y = int(match[1]), int(match[2]), int(match[3])
 
     if z < 0 or z > 19:
         json_response(handler, HTTPStatus.BAD_REQUEST, {"error": "invalid_zoom"})
@@ -900,19 +1193,8 @@ def handle_tile_proxy(handler: BaseHTTPRequestHandler, path: str) -> None:
         json_response(handler, HTTPStatus.BAD_REQUEST, {"error": "tile_out_of_bounds"})
         return
 
-    request = Request(
-        f"{OSM_TILE_BASE_URL}/{z}/{x}/{y}.png",
-        headers={
-            "User-Agent": NOMINATIM_USER_AGENT,
-            "Accept": "image/png",
-        },
-    )
-
     try:
-        with urlopen(request, timeout=5) as response:
-            if response.status != 200:
-                raise RuntimeError("tile_status")
-            payload = response.read()
+        payload = fetch_tile(z, x, y)
     except Exception:
         json_response(handler, HTTPStatus.BAD_GATEWAY, {"error": "tile_unavailable"})
         return
@@ -950,6 +1232,9 @@ def handle_admin_bootstrap(handler: BaseHTTPRequestHandler) -> None:
 
 
 def handle_admin_login(handler: BaseHTTPRequestHandler) -> None:
+    if login_rate_limited(client_ip(handler)):
+        json_response(handler, HTTPStatus.TOO_MANY_REQUESTS, {"error": "too_many_attempts"})
+        return
     try:
         body = read_json(handler)
     except Exception:
@@ -957,20 +1242,17 @@ def handle_admin_login(handler: BaseHTTPRequestHandler) -> None:
         return
     if not require_fields(handler, body, ["username", "password"]):
         return
-    if not admin_exists():
-        json_response(handler, HTTPStatus.PRECONDITION_FAILED, {"error": "admin_not_initialized"})
-        return
 
+    # One read answers both "initialized?" and fetches the salt PBKDF2 needs.
     admin = get_admin_user()
     if not admin:
-        json_response(handler, HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "admin_lookup_failed"})
+        json_response(handler, HTTPStatus.PRECONDITION_FAILED, {"error": "admin_not_initialized"})
         return
     if body["username"].strip() != admin["username"]:
         json_response(handler, HTTPStatus.UNAUTHORIZED, {"error": "invalid_credentials"})
         return
 
-    expected = pbkdf2_hash(body["password"], admin["password_salt"])
-    if not hmac.compare_digest(expected, admin["password_hash"]):
+    if not verify_admin_password(admin, body["password"]):
         json_response(handler, HTTPStatus.UNAUTHORIZED, {"error": "invalid_credentials"})
         return
 
@@ -982,23 +1264,50 @@ def handle_admin_logout(handler: BaseHTTPRequestHandler) -> None:
     auth_header = handler.headers.get("Authorization", "")
     token = auth_header.replace("Bearer ", "", 1).strip() if auth_header.startswith("Bearer ") else ""
     if token:
-        ADMIN_SESSIONS.pop(token, None)
+        delete_admin_session(token)
     json_response(handler, HTTPStatus.OK, {"logout": "ok"})
 
 
+# Event counts per source are taken from idx_open_data_event_source inside the write statements themselves.
+# (INSERT ... SELECT needs a WHERE clause before ON CONFLICT so SQLite can parse the upsert.)
+UPSERT_SOURCE_STATE_COUNT_SQL = """
+    INSERT INTO data_source_state (source_name, imported_at, record_count, notes)
+    SELECT :source, :now, (SELECT COUNT(*) FROM open_data_event WHERE source = :source), :notes
+    WHERE true
+    ON CONFLICT(source_name) DO UPDATE SET
+      imported_at = excluded.imported_at,
+      record_count = excluded.record_count,
+      notes = excluded.notes
+"""
+UPDATE_SOURCE_STATE_COUNT_SQL = """
+    UPDATE data_source_state
+    SET imported_at = :now, record_count = (SELECT COUNT(*) FROM open_data_event WHERE source = :source), notes = :notes
+    WHERE source_name = :source
+"""
+DELETE_EMPTY_SOURCE_STATE_SQL = """
+    DELETE FROM data_source_state
+    WHERE source_name = :source AND NOT EXISTS (SELECT 1 FROM open_data_event WHERE source = :source)
+"""
+ADMIN_OVERVIEW_COUNTS_SQL = """
+    SELECT
+      (SELECT COUNT(*) FROM spot) AS spots,
+      (SELECT COUNT(*) FROM community_signal) AS signals,
+      (SELECT COUNT(*) FROM open_data_event) AS events,
+      (SELECT COUNT(*) FROM data_source_state) AS data_sources
+"""
+
+
 def handle_admin_overview(handler: BaseHTTPRequestHandler) -> None:
     ok, username = admin_auth(handler)
     if not ok:
         json_response(handler, HTTPStatus.UNAUTHORIZED, {"error": username})
         return
 
-    with get_conn() as conn:
-        counts = {
-            "spots": conn.execute("SELECT COUNT(*) AS c FROM spot").fetchone()["c"],
-            "signals": conn.execute("SELECT COUNT(*) AS c FROM community_signal").fetchone()["c"],
-            "events": conn.execute("SELECT COUNT(*) AS c FROM open_data_event").fetchone()["c"],
-            "data_sources": conn.execute("SELECT COUNT(*) AS c FROM data_source_state").fetchone()["c"],
-        }
+    with get_read_conn() as conn:
+        # One read transaction, so the counts and the lists come from the same snapshot; the pool rolls it
+        # back when the connection is returned.
+        conn.execute("BEGIN")
+        counts = dict(conn.execute(ADMIN_OVERVIEW_COUNTS_SQL).fetchone())
         latest_signals = [dict(r) for r in conn.execute(
             """
             SELECT spot_id, signal_type, timestamp
@@ -1036,17 +1345,17 @@ def handle_admin_overview(handler: BaseHTTPRequestHandler) -> None:
     )
 
 
-def handle_admin_events_list(handler: BaseHTTPRequestHandler, query: dict[str, list[str]]) -> None:
+def handle_admin_events_list(handler: BaseHTTPRequestHandler, query: dict[str, str]) -> None:
     ok, username = admin_auth(handler)
     if not ok:
         json_response(handler, HTTPStatus.UNAUTHORIZED, {"error": username})
         return
     try:
-        limit = int((query.get("limit") or ["100"])[0])
+        limit = int(query.get("limit", "100"))
     except Exception:
         limit = 100
     limit = max(1, min(limit, 500))
-    with get_conn() as conn:
+    with get_read_conn() as conn:
         events = [dict(r) for r in conn.execute(
             """
             SELECT id, event_type, lat, lon, start_datetime, end_datetime, risk_modifier, source, imported_at
@@ -1059,6 +1368,13 @@ def handle_admin_events_list(handler: BaseHTTPRequestHandler, query: dict[str, l
     json_response(handler, HTTPStatus.OK, {"admin_user": username, "events": events})
 
 
+def refresh_source_state(conn: sqlite3.Connection, source: str, now_iso: str, notes: str) -> None:
+    # A source that lost its last event is dropped; otherwise its count is recomputed in SQL.
+    params = {"source": source, "now": now_iso, "notes": notes}
+    conn.execute(DELETE_EMPTY_SOURCE_STATE_SQL, params)
+    conn.execute(UPDATE_SOURCE_STATE_COUNT_SQL, params)
+
+
 def handle_admin_events_create(handler: BaseHTTPRequestHandler) -> None:
     ok, username = admin_auth(handler)
     if not ok:
@@ -1076,7 +1392,7 @@ def handle_admin_events_create(handler: BaseHTTPRequestHandler) -> None:
 
     now_iso = to_iso(utc_now())
     event_id = str(uuid.uuid4())
-    with get_conn() as conn:
+    with write_transaction(get_thread_conn()) as conn:
         conn.execute(
             """
             INSERT INTO open_data_event (
@@ -1095,18 +1411,11 @@ def handle_admin_events_create(handler: BaseHTTPRequestHandler) -> None:
                 now_iso,
             ),
         )
-        count = conn.execute("SELECT COUNT(*) AS c FROM open_data_event WHERE source = ?", (event["source"],)).fetchone()["c"]
         conn.execute(
-            """
-            INSERT INTO data_source_state (source_name, imported_at, record_count, notes)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(source_name) DO UPDATE SET
-              imported_at = excluded.imported_at,
-              record_count = excluded.record_count,
-              notes = excluded.notes
-            """,
-            (event["source"], now_iso, count, f"manual update by {username}"),
+            UPSERT_SOURCE_STATE_COUNT_SQL,
+            {"source": event["source"], "now": now_iso, "notes": f"manual update by {username}"},
         )
+    invalidate_data_source_meta()
     json_response(handler, HTTPStatus.CREATED, {"created": True, "id": event_id})
 
 
@@ -1126,7 +1435,7 @@ def handle_admin_events_update(handler: BaseHTTPRequestHandler, event_id: str) -
         return
 
     now_iso = to_iso(utc_now())
-    with get_conn() as conn:
+    with write_transaction(get_thread_conn()) as conn:
         existing = conn.execute("SELECT source FROM open_data_event WHERE id = ?", (event_id,)).fetchone()
         if not existing:
             json_response(handler, HTTPStatus.NOT_FOUND, {"error": "event_not_found"})
@@ -1149,32 +1458,14 @@ def handle_admin_events_update(handler: BaseHTTPRequestHandler, event_id: str) -
                 event_id,
             ),
         )
-        count_new = conn.execute("SELECT COUNT(*) AS c FROM open_data_event WHERE source = ?", (event["source"],)).fetchone()["c"]
         conn.execute(
-            """
-            INSERT INTO data_source_state (source_name, imported_at, record_count, notes)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(source_name) DO UPDATE SET
-              imported_at = excluded.imported_at,
-              record_count = excluded.record_count,
-              notes = excluded.notes
-            """,
-            (event["source"], now_iso, count_new, f"manual update by {username}"),
+            UPSERT_SOURCE_STATE_COUNT_SQL,
+            {"source": event["source"], "now": now_iso, "notes": f"manual update by {username}"},
         )
         old_source = existing["source"]
         if old_source != event["source"]:
-            count_old = conn.execute("SELECT COUNT(*) AS c FROM open_data_event WHERE source = ?", (old_source,)).fetchone()["c"]
-            if count_old == 0:
-                conn.execute("DELETE FROM data_source_state WHERE source_name = ?", (old_source,))
-            else:
-                conn.execute(
-                    """
-                    UPDATE data_source_state
-                    SET imported_at = ?, record_count = ?, notes = ?
-                    WHERE source_name = ?
-                    """,
-                    (now_iso, count_old, f"manual update by {username}", old_source),
-                )
+            refresh_source_state(conn, old_source, now_iso, f"manual update by {username}")
+    invalidate_data_source_meta()
     json_response(handler, HTTPStatus.OK, {"updated": True, "id": event_id})
 
 
@@ -1185,106 +1476,173 @@ def handle_admin_events_delete(handler: BaseHTTPRequestHandler, event_id: str) -
         return
 
     now_iso = to_iso(utc_now())
-    with get_conn() as conn:
+    with write_transaction(get_thread_conn()) as conn:
         existing = conn.execute("SELECT source FROM open_data_event WHERE id = ?", (event_id,)).fetchone()
         if not existing:
             json_response(handler, HTTPStatus.NOT_FOUND, {"error": "event_not_found"})
             return
         source_name = existing["source"]
         conn.execute("DELETE FROM open_data_event WHERE id = ?", (event_id,))
-        count = conn.execute("SELECT COUNT(*) AS c FROM open_data_event WHERE source = ?", (source_name,)).fetchone()["c"]
-        if count == 0:
-            conn.execute("DELETE FROM data_source_state WHERE source_name = ?", (source_name,))
-        else:
-            conn.execute(
-                """
-                UPDATE data_source_state
-                SET imported_at = ?, record_count = ?, notes = ?
-                WHERE source_name = ?
-                """,
-                (now_iso, count, f"manual delete by {username}", source_name),
-            )
+        refresh_source_state(conn, source_name, now_iso, f"manual delete by {username}")
+    invalidate_data_source_meta()
     json_response(handler, HTTPStatus.OK, {"deleted": True, "id": event_id})
 
 
+def handle_health(handler: BaseHTTPRequestHandler) -> None:
+    sources = data_source_meta()
+    json_response(handler, HTTPStatus.OK, {"status": "ok", "sources": sources, "health": source_health(sources, utc_now())})
+
+
+# Exact-path routes per method. Query routes get the parsed query string; /map/tile/ and /admin/events/<id>
+# carry parameters in the path and are matched by prefix in the handler methods.
+GET_ROUTES = {
+    "/health": handle_health,
+    "/admin/bootstrap/status": handle_admin_bootstrap_status,
+    "/admin/overview": handle_admin_overview,
+}
+GET_QUERY_ROUTES = {
+    "/spot/score": handle_score,
+    "/geocode/search": handle_geocode_search,
+    "/admin/events": handle_admin_events_list,
+}
+POST_ROUTES = {
+    "/spot/signal": handle_signal,
+    "/admin/bootstrap": handle_admin_bootstrap,
+    "/admin/login": handle_admin_login,
+    "/admin/logout": handle_admin_logout,
+    "/admin/events": handle_admin_events_create,
+}
+ADMIN_EVENT_PREFIX = "/admin/events/"
+
+
 class StaySenseHandler(BaseHTTPRequestHandler):
+    # Persistent connections; every response carries Content-Length. An idle connection pins a pool worker,
+    # so it is dropped after KEEPALIVE_TIMEOUT_SECONDS without a new request line; once a request has
+    # started, headers and body get REQUEST_TIMEOUT_SECONDS.
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT_SECONDS
+
     def log_message(self, format: str, *args) -> None:
         return
 
-    def do_GET(self) -> None:
-        parsed = urlparse(self.path)
-        if parsed.path == "/health":
-            sources = data_source_meta()
-            json_response(self, HTTPStatus.OK, {"status": "ok", "sources": sources, "health": source_health(sources, utc_now())})
-            return
-        if parsed.path == "/spot/score":
-            query = parse_qs(parsed.query)
-            handle_score(self, query)
-            return
-        if parsed.path == "/geocode/search":
-            query = parse_qs(parsed.query)
-            handle_geocode_search(self, query)
-            return
-        if parsed.path.startswith("/map/tile/"):
-            handle_tile_proxy(self, parsed.path)
+    def parse_request(self) -> bool:
+        self.connection.settimeout(REQUEST_TIMEOUT_SECONDS)
+        return super().parse_request()
+
+    def handle_one_request(self) -> None:
+        self.body_consumed = False
+        self.connection.settimeout(KEEPALIVE_TIMEOUT_SECONDS)
+        super().handle_one_request()
+        if self.close_connection or self.body_consumed:
             return
-        if parsed.path == "/admin/bootstrap/status":
-            handle_admin_bootstrap_status(self)
+        # Answered without reading the request body (404, 401, ...): skip it so the next request on this
+        # connection starts at a request line. Bodies we cannot size end the connection instead.
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if "Transfer-Encoding" in self.headers or not 0 <= length <= MAX_DRAIN_BYTES:
+            self.close_connection = True
+        elif length:
+            self.rfile.read(length)
+
+    def do_GET(self) -> None:
+        path, _, raw_query = self.path.partition("?")
+        route = GET_ROUTES.get(path)
+        if route is not None:
+            route(self)
             return
-        if parsed.path == "/admin/overview":
-            handle_admin_overview(self)
+        query_route = GET_QUERY_ROUTES.get(path)
+        if query_route is not None:
+            query_route(self, dict(parse_qsl(raw_query)))
             return
-        if parsed.path == "/admin/events":
-            query = parse_qs(parsed.query)
-            handle_admin_events_list(self, query)
+        if path.startswith("/map/tile/"):
+            handle_tile_proxy(self, path)
             return
         json_response(self, HTTPStatus.NOT_FOUND, {"error": "not_found"})
 
     def do_POST(self) -> None:
-        parsed = urlparse(self.path)
-        if parsed.path == "/spot/signal":
-            handle_signal(self)
-            return
-        if parsed.path == "/admin/bootstrap":
-            handle_admin_bootstrap(self)
-            return
-        if parsed.path == "/admin/login":
-            handle_admin_login(self)
-            return
-        if parsed.path == "/admin/logout":
-            handle_admin_logout(self)
-            return
-        if parsed.path == "/admin/events":
-            handle_admin_events_create(self)
+        route = POST_ROUTES.get(self.path.partition("?")[0])
+        if route is not None:
+            route(self)
             return
         json_response(self, HTTPStatus.NOT_FOUND, {"error": "not_found"})
 
+    def admin_event_id(self) -> str | None:
+        path = self.path.partition("?")[0]
+        if not path.startswith(ADMIN_EVENT_PREFIX):
+            json_response(self, HTTPStatus.NOT_FOUND, {"error": "not_found"})
+            return None
+        event_id = path[len(ADMIN_EVENT_PREFIX) :].strip()
+        if not event_id:
+            json_response(self, HTTPStatus.BAD_REQUEST, {"error": "event_id_required"})
+            return None
+        return event_id
+
     def do_PUT(self) -> None:
-        parsed = urlparse(self.path)
-        if parsed.path.startswith("/admin/events/"):
-            event_id = parsed.path.replace("/admin/events/", "", 1).strip()
-            if not event_id:
-                json_response(self, HTTPStatus.BAD_REQUEST, {"error": "event_id_required"})
-                return
+        event_id = self.admin_event_id()
+        if event_id is not None:
             handle_admin_events_update(self, event_id)
-            return
-        json_response(self, HTTPStatus.NOT_FOUND, {"error": "not_found"})
 
     def do_DELETE(self) -> None:
-        parsed = urlparse(self.path)
-        if parsed.path.startswith("/admin/events/"):
-            event_id = parsed.path.replace("/admin/events/", "", 1).strip()
-            if not event_id:
-                json_response(self, HTTPStatus.BAD_REQUEST, {"error": "event_id_required"})
-                return
+        event_id = self.admin_event_id()
+        if event_id is not None:
             handle_admin_events_delete(self, event_id)
-            return
-        json_response(self, HTTPStatus.NOT_FOUND, {"error": "not_found"})
+
+
+class PooledHTTPServer(ThreadingHTTPServer):
+    # Connections are handled by a fixed set of worker threads instead of one new thread each; under a
+    # burst, extra connections wait in the executor queue rather than piling up threads.
+    def __init__(self, server_address: tuple[str, int], handler_class: type, workers: int = SERVER_WORKERS) -> None:
+        super().__init__(server_address, handler_class)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="staysense-http")
+
+    def process_request(self, request, client_address) -> None:
+        self._executor.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+def run_maintenance() -> None:
+    now = utc_now()
+    with _admin_session_cache_lock:
+        for token_hash in [t for t, (_, expires_at) in _admin_session_cache.items() if expires_at <= now]:
+            del _admin_session_cache[token_hash]
+    cutoff = time.monotonic() - ADMIN_LOGIN_RATE_WINDOW_SECONDS
+    with _login_attempts_lock:
+        for address in [a for a, attempts in _login_attempts.items() if not attempts or attempts[-1] <= cutoff]:
+            del _login_attempts[address]
+    # Entries older than the cooldown can only matter for backdated signals; SQLite still answers those.
+    expired_iso = to_iso(now - dt.timedelta(hours=SIGNAL_COOLDOWN_HOURS))
+    with _latest_signal_lock:
+        for key in [k for k, latest_iso in _latest_signal.items() if latest_iso < expired_iso]:
+            del _latest_signal[key]
+    try:
+        with get_thread_conn() as conn:
+            conn.execute("DELETE FROM admin_session WHERE expires_at <= ?", (to_iso(now),))
+    except sqlite3.OperationalError:
+        # Read-only database: expired sessions are still rejected by admin_auth.
+        pass
+    # Signal bursts grow the WAL past what autocheckpoint trims; truncate it while the server is idle-ish.
+    checkpoint_wal(get_thread_conn())
+
+
+def maintenance_loop() -> None:
+    while True:
+        time.sleep(MAINTENANCE_INTERVAL_SECONDS)
+        try:
+            run_maintenance()
+        except Exception:
+            # Housekeeping must never take the server down; the next tick retries.
+            pass
 
 
 def main() -> None:
     init_db()
-    server = ThreadingHTTPServer((HOST, PORT), StaySenseHandler)
+    threading.Thread(target=maintenance_loop, name="staysense-maintenance", daemon=True).start()
+    server = PooledHTTPServer((HOST, PORT), StaySenseHandler)
     print(f"StaySense API listening on http://{HOST}:{PORT}")
     server.serve_forever()
 
@@ -0,0 +1,44 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+import import_osm_overpass
+from import_osm_overpass import iter_json_array
+
+ELEMENTS = [
+    {"type": "node", "id": 1, "lat": 51.25, "lon": 6.97, "tags": {"name": "Düsseldorfer Straße €"}},
+    {"type": "way", "id": 2, "center": {"lat": 51.3, "lon": 7.0}, "tags": {"note": 'closing ] and "elements":['}},
+    {"type": "node", "id": 3, "lat": 51.2, "lon": 6.9, "tags": {"name": "Café 😀", "amenity": "police"}},
+]
+BODY = json.dumps(
+    {"version": 0.6, "remark": 'not here: "elements":[', "elements": ELEMENTS}, ensure_ascii=False
+).encode("utf-8")
+
+
+class IterJsonArrayTests(unittest.TestCase):
+    def parse(self, body: bytes, chunk_bytes: int) -> list:
+        with mock.patch.object(import_osm_overpass, "STREAM_CHUNK_BYTES", chunk_bytes):
+            return list(iter_json_array(io.BytesIO(body), "elements"))
+
+    def test_small_chunks_split_items_and_multibyte_characters(self) -> None:
+        for chunk_bytes in (1, 2, 3, 5, 7):
+            with self.subTest(chunk_bytes=chunk_bytes):
+                self.assertEqual(self.parse(BODY, chunk_bytes), ELEMENTS)
+
+    def test_missing_key_yields_nothing(self) -> None:
+        body = json.dumps({"version": 0.6, "remark": "runtime error"}).encode("utf-8")
+        self.assertEqual(self.parse(body, 3), [])
+
+    def test_truncated_body_raises(self) -> None:
+        end_of_array = BODY.rindex(b"]")
+        # Before the key, inside an item, between items, right before the closing bracket.
+        cuts = (BODY.index(b'"remark"') + 5, BODY.index(b'"id": 2') + 4, BODY.index(b'{"type": "way"'), end_of_array)
+        for cut in cuts:
+            with self.subTest(cut=cut):
+                with self.assertRaises(ValueError):
+                    self.parse(BODY[:cut], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
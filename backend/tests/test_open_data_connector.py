@@ -1,12 +1,27 @@
+import functools
+import hashlib
+import json
+import tempfile
+import threading
 import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from unittest import mock
 
-from open_data_connector import import_from_config
+from db import get_read_conn, write_transaction
+from open_data_connector import HTTP_CACHE_DIR, import_from_config
+
+DOCS_DIR = Path(__file__).resolve().parents[2] / "docs"
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args) -> None:
+        pass
 
 
 class OpenDataConnectorTests(unittest.TestCase):
     def test_import_from_config_has_stats(self) -> None:
-        cfg = Path(__file__).resolve().parents[2] / "docs" / "open_data_sources.json"
+        cfg = DOCS_DIR / "open_data_sources.json"
         result = import_from_config(cfg, prune_legacy=True)
         self.assertIn("imported", result)
         self.assertIn("pruned", result)
@@ -16,6 +31,52 @@ class OpenDataConnectorTests(unittest.TestCase):
         self.assertIn("stats", imported)
         self.assertIn("accepted", imported["stats"])
 
+    def test_unchanged_http_source_advances_imported_at(self) -> None:
+        handler = functools.partial(_QuietHandler, directory=str(DOCS_DIR))
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        source = {
+            "id": "unchanged_http_csv",
+            "enabled": True,
+            "format": "csv",
+            "url": f"http://127.0.0.1:{server.server_address[1]}/open_data_events_template.csv",
+            "source_name": "test_unchanged_http",
+        }
+        self.addCleanup(self._forget_source, source["source_name"], source["url"])
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = Path(tmp) / "sources.json"
+            cfg.write_text(json.dumps({"sources": [source]}), encoding="utf-8")
+            with mock.patch("open_data_connector.now_iso", return_value="2026-01-01T00:00:00Z"):
+                first = import_from_config(cfg)["imported"][0]
+            with mock.patch("open_data_connector.now_iso", return_value="2026-01-02T00:00:00Z"):
+                second = import_from_config(cfg)["imported"][0]
+
+        self.assertNotIn("unchanged", first)
+        self.assertTrue(second.get("unchanged"))
+        self.assertEqual(second["rows"], first["rows"])
+        self.assertIn("stats", first)
+        self.assertEqual(second["stats"]["accepted"], first["stats"]["accepted"])
+        with get_read_conn() as conn:
+            row = conn.execute(
+                "SELECT imported_at, record_count FROM data_source_state WHERE source_name = ?",
+                ("test_unchanged_http",),
+            ).fetchone()
+        self.assertEqual(row["imported_at"], "2026-01-02T00:00:00Z")
+        self.assertEqual(row["record_count"], first["rows"])
+
+    @staticmethod
+    def _forget_source(source_name: str, url: str) -> None:
+        # Runs against the real database, so leave neither rows nor a cached body behind.
+        with write_transaction() as conn:
+            conn.execute("DELETE FROM open_data_event WHERE source = ?", (source_name,))
+            conn.execute("DELETE FROM data_source_state WHERE source_name = ?", (source_name,))
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        for suffix in (".body", ".json"):
+            (HTTP_CACHE_DIR / f"{key}{suffix}").unlink(missing_ok=True)
+
 
 if __name__ == "__main__":
     unittest.main()
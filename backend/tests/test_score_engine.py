@@ -1,7 +1,17 @@
 import datetime as dt
+import math
 import unittest
 
-from score_engine import ampel, clamp_score, night_window_for
+from score_engine import (
+    EARTH_RADIUS_M,
+    PointIndex,
+    ampel,
+    clamp_score,
+    nearest_distance_m,
+    nearest_zone_type,
+    night_window_for,
+    unit_vector,
+)
 
 
 class ScoreEngineTests(unittest.TestCase):
@@ -20,6 +30,24 @@ class ScoreEngineTests(unittest.TestCase):
         self.assertEqual(start.hour, 22)
         self.assertEqual(end.hour, 6)
 
+    def test_point_index_matches_linear_scan(self) -> None:
+        points = [(51.0 + (i % 37) * 0.013, 6.5 + (i % 53) * 0.017) for i in range(400)]
+        index = PointIndex(points)
+        for lat, lon in [(51.25, 6.97), (51.4, 7.3), (50.9, 6.4), (51.123, 6.789)]:
+            self.assertEqual(nearest_distance_m(lat, lon, index), nearest_distance_m(lat, lon, points))
+
+    def test_zone_types_on_the_same_meter_tie_in_area_zone_order(self) -> None:
+        lat, lon = 51.25, 6.97
+        meters_to_deg = 180 / (math.pi * EARTH_RADIUS_M)
+        index = PointIndex(
+            [(lat - 300.1 * meters_to_deg, lon), (lat + 300.9 * meters_to_deg, lon)],
+            labels=["commercial", "industrial"],
+        )
+        self.assertEqual(int(nearest_distance_m(lat, lon, [index.points[0]])), 300)
+        self.assertEqual(int(nearest_distance_m(lat, lon, [index.points[1]])), 300)
+        self.assertEqual(nearest_zone_type(unit_vector(lat, lon), index, 400), "industrial")
+        self.assertEqual(nearest_zone_type(unit_vector(lat, lon), index, 299), None)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,73 @@
+import http.client
+import re
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+
+import server
+from db import init_db
+
+KEEPALIVE_SECONDS = 0.3
+
+
+class PooledServerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        init_db()
+        for patcher in (
+            mock.patch.object(server, "KEEPALIVE_TIMEOUT_SECONDS", KEEPALIVE_SECONDS),
+            mock.patch.object(server.StaySenseHandler, "timeout", KEEPALIVE_SECONDS),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.httpd = server.PooledHTTPServer(("127.0.0.1", 0), server.StaySenseHandler, workers=2)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.addCleanup(self.httpd.server_close)
+        self.addCleanup(self.httpd.shutdown)
+        self.port = self.httpd.server_address[1]
+
+    def connect(self) -> http.client.HTTPConnection:
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+        self.addCleanup(conn.close)
+        return conn
+
+    def test_idle_keepalive_connections_do_not_block_new_clients(self) -> None:
+        # More kept-alive connections than workers, each parked after one request.
+        for _ in range(3):
+            conn = self.connect()
+            conn.request("GET", "/health")
+            response = conn.getresponse()
+            response.read()
+            self.assertEqual(response.status, 200)
+            self.assertFalse(response.will_close)
+
+        started = time.monotonic()
+        conn = self.connect()
+        conn.request("GET", "/health")
+        response = conn.getresponse()
+        response.read()
+        self.assertEqual(response.status, 200)
+        # Idle connections give their worker back after one keep-alive timeout; allow one more for the queue.
+        self.assertLess(time.monotonic() - started, 2 * KEEPALIVE_SECONDS + 1.0)
+
+    def test_unread_request_body_is_drained_for_pipelined_request(self) -> None:
+        sock = socket.create_connection(("127.0.0.1", self.port), timeout=10)
+        self.addCleanup(sock.close)
+        sock.sendall(
+            b"POST /no-such-route HTTP/1.1\r\nHost: test\r\nContent-Length: 11\r\n\r\nhello world"
+            b"GET /health HTTP/1.1\r\nHost: test\r\n\r\n"
+        )
+        data = b""
+        while data.count(b"HTTP/1.1 ") < 2:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        # The second status line follows the first body directly, without a line break.
+        statuses = re.findall(rb"HTTP/1\.1 (\d{3}) ", data)
+        self.assertEqual(statuses, [b"404", b"200"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+"""Small GitHub REST/GraphQL client shared by the roadmap scripts.
+
+Talks to api.github.com over keep-alive HTTPS connections (one per thread) instead of spawning a `gh`
+process per call. The token comes from GH_TOKEN/GITHUB_TOKEN or, failing that, `gh auth token` once.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+API_HOST = "api.github.com"
+API_TIMEOUT_SECONDS = 30
+# Sleeping past the reset is capped so a wrong clock cannot park a CI job for an hour.
+MAX_RATE_LIMIT_WAIT_SECONDS = 120
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "staysense" / "gh"
+DEFAULT_CACHE_TTL_SECONDS = 600
+
+
+def resolve_token() -> str:
+    token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+    if token:
+        return token
+    proc = subprocess.run(["gh", "auth", "token"], capture_output=True, text=True)
+    if proc.returncode != 0 or not proc.stdout.strip():
+        raise RuntimeError(f"No GitHub token: set GH_TOKEN or run 'gh auth login'.\n{proc.stderr.strip()}")
+    return proc.stdout.strip()
+
+
+def path_segment(value: str) -> str:
+    return quote(value, safe="")
+
+
+class GitHubClient:
+    def __init__(self, token: str | None = None, cache_ttl: float = 0) -> None:
+        """`cache_ttl` > 0 keeps GET and GraphQL query (not mutation) responses on disk for that many seconds."""
+        self.cache_ttl = cache_ttl
+        self.headers = {
+            "Authorization": f"Bearer {token or resolve_token()}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "User-Agent": "staysense-roadmap-scripts",
+        }
+        self._local = threading.local()
+        self._rate_lock = threading.Lock()
+        self._rate_remaining: int | None = None
+        self._rate_reset = 0.0
+
+    def _connection(self) -> tuple[http.client.HTTPSConnection, bool]:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn, True
+        conn = http.client.HTTPSConnection(API_HOST, timeout=API_TIMEOUT_SECONDS)
+        self._local.conn = conn
+        return conn, False
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+    def _wait_for_rate_limit(self) -> None:
+        with self._rate_lock:
+            remaining, reset = self._rate_remaining, self._rate_reset
+        if remaining is None or remaining > 0:
+            return
+        delay = min(reset - time.time() + 1, MAX_RATE_LIMIT_WAIT_SECONDS)
+        if delay > 0:
+            print(f"[info] GitHub rate limit exhausted, waiting {delay:.0f}s")
+            time.sleep(delay)
+
+    def _track_rate_limit(self, response: http.client.HTTPResponse) -> None:
+        remaining = response.getheader("X-RateLimit-Remaining")
+        reset = response.getheader("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        with self._rate_lock:
+            self._rate_remaining = int(remaining)
+            self._rate_reset = float(reset)
+
+    def _cache_path(self, method: str, path: str, payload: dict | None) -> Path | None:
+        if self.cache_ttl <= 0:
+            return None
+        is_query = path == "/graphql" and not payload["query"].lstrip().startswith("mutation")
+        if method != "GET" and not is_query:
+            return None
+        # The token is part of the key so different accounts never see each other's answers.
+        key = json.dumps([self.headers["Authorization"], method, path, payload], sort_keys=True).encode("utf-8")
+        return CACHE_DIR / f"{hashlib.blake2b(key, digest_size=16).hexdigest()}.json"
+
+    def _cache_read(self, cache_path: Path) -> dict | list | None:
+        try:
+            if time.time() - cache_path.stat().st_mtime > self.cache_ttl:
+                return None
+            return json.loads(cache_path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def _cache_write(self, cache_path: Path, data: dict | list | None) -> None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}")
+            tmp_path.write_text(json.dumps(data), encoding="utf-8")
+            # Atomic rename, so concurrent runs never read a half-written entry.
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+    def request(self, method: str, path: str, payload: dict | None = None) -> dict | list | None:
+        cache_path = self._cache_path(method, path, payload)
+        if cache_path is not None:
+            cached = self._cache_read(cache_path)
+            if cached is not None:
+                return cached
+        data = self._send(method, path, payload)
+        if cache_path is not None and not (isinstance(data, dict) and data.get("errors")):
+            self._cache_write(cache_path, data)
+        return data
+
+    def _send(self, method: str, path: str, payload: dict | None) -> dict | list | None:
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        headers = self.headers if body is None else {**self.headers, "Content-Type": "application/json"}
+        self._wait_for_rate_limit()
+        for attempt in range(2):
+            conn, reused = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                raw = response.read()
+            except (ConnectionError, http.client.BadStatusLine):
+                self._drop_connection()
+                # GitHub closes idle keep-alive connections; retry once on a fresh one.
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                self._drop_connection()
+                raise
+            if response.will_close:
+                self._drop_connection()
+            self._track_rate_limit(response)
+            data = json.loads(raw) if raw else None
+            if response.status >= 400:
+                message = data.get("message", "") if isinstance(data, dict) else raw.decode("utf-8", "replace")
+                raise RuntimeError(f"GitHub API {method} {path} failed: {response.status} {message}".rstrip())
+            return data
+        raise ConnectionError("github_unavailable")
+
+    def graphql(self, query: str, variables: dict | None = None) -> dict:
+        payload = self.request("POST", "/graphql", {"query": query, "variables": variables or {}})
+        errors = payload.get("errors")
+        if errors:
+            raise RuntimeError("GitHub GraphQL failed: " + "; ".join(err.get("message", "") for err in errors))
+        return payload["data"]
+
+
+def project_query(owner: str, selection: str, variables: str = "") -> str:
+    """GraphQL query reading `selection` from project `$number` of `owner` ("@me" = token user).
+
+    The owner's login is passed as `$login` for anyone other than "@me"; the result sits at
+    data["owner"]["projectV2"].
+    """
+    extra = f", {variables}" if variables else ""
+    if owner == "@me":
+        return f"query($number: Int!{extra}) {{ owner: viewer {{ projectV2(number: $number) {{ {selection} }} }} }}"
+    return (
+        f"query($login: String!, $number: Int!{extra}) {{ owner: repositoryOwner(login: $login) {{ "
+        f"... on ProjectV2Owner {{ projectV2(number: $number) {{ {selection} }} }} }} }}"
+    )
+
+
+def project_variables(owner: str, number: int, **extra) -> dict:
+    variables = {"number": number, **extra}
+    if owner != "@me":
+        variables["login"] = owner
+    return variables
+
+
+def project_node(data: dict, owner: str, number: int) -> dict:
+    project = (data.get("owner") or {}).get("projectV2")
+    if not project:
+        raise RuntimeError(f"Project {number} of owner '{owner}' not found or not accessible.")
+    return project
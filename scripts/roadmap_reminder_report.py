@@ -5,98 +5,174 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
-import json
-import subprocess
+import io
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
-
-def run(cmd: list[str], expect_json: bool = False) -> dict | list | str:
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    if proc.returncode != 0:
-        raise RuntimeError(f"Command failed: {' '.join(cmd)}\n{proc.stderr.strip()}")
-    data = proc.stdout.strip()
-    if expect_json:
-        return json.loads(data or "{}")
-    return data
+from github_api import (
+    DEFAULT_CACHE_TTL_SECONDS,
+    GitHubClient,
+    path_segment,
+    project_node,
+    project_query,
+    project_variables,
+)
+
+REPORT_TABLE_HEADER = (
+    "| Issue | Titel | Status | Prio | Window | Deadline | Quelle | Tage |\n"
+    "|---|---|---|---|---|---|---|---:|\n"
+)
+# Bound once; called as REPORT_ROW(row, title, days) for every table row.
+REPORT_ROW = (
+    "| [#{0.number}]({0.url}) | {1} | {0.status} | {0.priority} | {0.window} | {0.deadline} | {0.source} | {2} |\n"
+).format
+ROADMAP_LABEL = "roadmap"
+REPORT_LABEL = "roadmap-report"
+REPORT_LABEL_FIELDS = {"color": "8a2be2", "description": "Automatischer Roadmap Report"}
+OPEN_ISSUES_QUERY = """
+query($owner: String!, $name: String!, $labels: [String!], $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    issues(
+      states: OPEN, labels: $labels, first: 100, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}
+    ) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        url
+        milestone { title dueOn }
+        labels(first: 50) { nodes { name } }
+      }
+    }
+  }
+}
+"""
+# Both lookups for an existing report issue in one request: exact title via search, else by the first label.
+FIND_REPORT_ISSUE_QUERY = """
+query($search: String!, $owner: String!, $name: String!, $labels: [String!], $byLabel: Boolean!) {
+  byTitle: search(query: $search, type: ISSUE, first: 20) {
+    nodes { ... on Issue { number title url labels(first: 100) { nodes { name } } } }
+  }
+  repository(owner: $owner, name: $name) @include(if: $byLabel) {
+    issues(states: OPEN, labels: $labels, first: 20, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { number title url labels(first: 100) { nodes { name } } }
+    }
+  }
+}
+"""
+PROJECT_ITEMS_SELECTION = """
+    items(first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        content { __typename ... on Issue { number } }
+        fieldValues(first: 50) {
+          nodes {
+            __typename
+            ... on ProjectV2ItemFieldTextValue { text field { ... on ProjectV2FieldCommon { name } } }
+            ... on ProjectV2ItemFieldDateValue { date field { ... on ProjectV2FieldCommon { name } } }
+            ... on ProjectV2ItemFieldNumberValue { number field { ... on ProjectV2FieldCommon { name } } }
+            ... on ProjectV2ItemFieldSingleSelectValue { name field { ... on ProjectV2FieldCommon { name } } }
+            ... on ProjectV2ItemFieldIterationValue { title field { ... on ProjectV2FieldCommon { name } } }
+          }
+        }
+      }
+    }
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ReportRow:
+    number: int
+    title: str
+    url: str
+    status: str
+    priority: str
+    window: str
+    milestone: str
+    deadline: str
+    source: str
+    days_left: int | None
+    sort_deadline: dt.date
 
 
 def parse_date(value: str | None) -> dt.date | None:
     if not value:
         return None
-    text = value.strip()
-    if not text:
-        return None
     try:
-        if "T" in text:
-            return dt.date.fromisoformat(text.split("T", 1)[0])
-        return dt.date.fromisoformat(text)
+        # Covers both plain dates and the date part of timestamps like milestone dueOn.
+        return dt.date.fromisoformat(value.strip()[:10])
     except Exception:
         return None
 
 
-def fetch_open_roadmap_issues(repo: str) -> list[dict]:
-    payload = run(
-        [
-            "gh",
-            "issue",
-            "list",
-            "--repo",
-            repo,
-            "--state",
-            "open",
-            "--limit",
-            "200",
-            "--json",
-            "number,title,milestone,labels,url",
-        ],
-        expect_json=True,
-    )
+def fetch_open_roadmap_issues(client: GitHubClient, repo: str) -> list[dict]:
+    owner, name = repo.split("/", 1)
     out = []
-    for item in payload:
-        labels = [it.get("name", "") for it in item.get("labels", [])]
-        if "roadmap" not in labels:
-            continue
-        if "roadmap-report" in labels:
+    cursor = None
+    while True:
+        # The label filter runs server-side; only the report issue itself (it carries both labels) is dropped here.
+        data = client.graphql(
+            OPEN_ISSUES_QUERY, {"owner": owner, "name": name, "labels": [ROADMAP_LABEL], "cursor": cursor}
+        )
+        page = data["repository"]["issues"]
+        for item in page["nodes"]:
+            if not any(label["name"] == REPORT_LABEL for label in item["labels"]["nodes"]):
+                out.append(item)
+        if not page["pageInfo"]["hasNextPage"]:
+            return out
+        cursor = page["pageInfo"]["endCursor"]
+
+
+def field_values(item: dict) -> dict[str, object]:
+    """Project field values of an item keyed by lower-cased field name."""
+    values = {}
+    for node in item["fieldValues"]["nodes"]:
+        field = node.get("field") or {}
+        if not field.get("name"):
             continue
-        out.append(item)
-    return out
+        for key in ("text", "date", "number", "name", "title"):
+            if key in node:
+                values[field["name"].lower()] = node[key]
+                break
+    return values
 
 
-def fetch_project_metadata(project_number: int | None, project_owner: str | None) -> tuple[dict[int, dict], str | None]:
+def fetch_project_metadata(
+    client: GitHubClient, project_number: int | None, project_owner: str | None
+) -> tuple[dict[int, dict], str | None]:
     if not project_number or not project_owner:
         return {}, "Project-Metadaten nicht konfiguriert (owner/number fehlen)."
+    query = project_query(project_owner, PROJECT_ITEMS_SELECTION, "$cursor: String")
+    items = []
+    cursor = None
     try:
-        payload = run(
-            [
-                "gh",
-                "project",
-                "item-list",
-                str(project_number),
-                "--owner",
-                project_owner,
-                "--format",
-                "json",
-            ],
-            expect_json=True,
-        )
+        while True:
+            data = client.graphql(query, project_variables(project_owner, project_number, cursor=cursor))
+            page = project_node(data, project_owner, project_number)["items"]
+            items.extend(page["nodes"])
+            if not page["pageInfo"]["hasNextPage"]:
+                break
+            cursor = page["pageInfo"]["endCursor"]
     except Exception as exc:
         return {}, f"Project-Metadaten nicht abrufbar: {exc}"
 
     out: dict[int, dict] = {}
-    for item in payload.get("items", []):
+    for item in items:
         content = item.get("content") or {}
-        if content.get("type") != "Issue":
+        if content.get("__typename") != "Issue":
             continue
         number = content.get("number")
         if not isinstance(number, int):
             continue
+        values = field_values(item)
         out[number] = {
-            "target_date": item.get("target date"),
-            "start_date": item.get("start date"),
-            "priority": item.get("priority"),
-            "status": item.get("status"),
-            "window": item.get("roadmap Window"),
+            "target_date": values.get("target date"),
+            "start_date": values.get("start date"),
+            "priority": values.get("priority"),
+            "status": values.get("status"),
+            "window": values.get("roadmap window"),
         }
     return out, None
 
@@ -109,29 +185,31 @@ def build_report(issues: list[dict], project_meta: dict[int, dict], warning: str
     upcoming = []
     no_deadline = []
     all_rows = []
+    meta_get = project_meta.get
+    no_meta: dict = {}
 
     for issue in issues:
         number = issue["number"]
-        meta = project_meta.get(number, {})
-        milestone = issue.get("milestone") or {}
+        meta = meta_get(number, no_meta)
+        milestone = issue.get("milestone") or no_meta
         milestone_due = parse_date(milestone.get("dueOn"))
         target_date = parse_date(meta.get("target_date"))
         deadline = target_date or milestone_due
         source = "target date" if target_date else ("milestone" if milestone_due else "-")
-        days_left = (deadline - today).days if deadline else None
-
-        row = {
-            "number": number,
-            "title": issue["title"],
-            "url": issue["url"],
-            "status": meta.get("status", "Todo"),
-            "priority": meta.get("priority", "-"),
-            "window": meta.get("window", "-"),
-            "milestone": milestone.get("title", "-"),
-            "deadline": deadline.isoformat() if deadline else "-",
-            "source": source,
-            "days_left": days_left,
-        }
+
+        row = ReportRow(
+            number,
+            issue["title"],
+            issue["url"],
+            meta.get("status", "Todo"),
+            meta.get("priority", "-"),
+            meta.get("window", "-"),
+            milestone.get("title", "-"),
+            deadline.isoformat() if deadline else "-",
+            source,
+            (deadline - today).days if deadline else None,
+            deadline or dt.date.max,
+        )
         all_rows.append(row)
 
         if not deadline:
@@ -141,144 +219,96 @@ def build_report(issues: list[dict], project_meta: dict[int, dict], warning: str
         elif deadline <= threshold:
             upcoming.append(row)
 
-    all_rows.sort(key=lambda r: (r["deadline"] == "-", r["deadline"], r["priority"], r["number"]))
-    overdue.sort(key=lambda r: (r["deadline"], r["number"]))
-    upcoming.sort(key=lambda r: (r["deadline"], r["number"]))
-    no_deadline.sort(key=lambda r: r["number"])
-
-    lines = []
-    lines.append(f"# Roadmap Health Report ({today.isoformat()})")
-    lines.append("")
-    lines.append("Automatisch generierter Reminder fuer Roadmap-Issues.")
-    lines.append("")
-    lines.append("## Summary")
-    lines.append("")
-    lines.append(f"- Open roadmap issues: **{len(issues)}**")
-    lines.append(f"- Overdue: **{len(overdue)}**")
-    lines.append(f"- Upcoming (naechste {upcoming_days} Tage): **{len(upcoming)}**")
-    lines.append(f"- Ohne Deadline: **{len(no_deadline)}**")
-    lines.append("")
+    all_rows.sort(key=lambda r: (r.sort_deadline, r.priority, r.number))
+    overdue.sort(key=lambda r: (r.sort_deadline, r.number))
+    upcoming.sort(key=lambda r: (r.sort_deadline, r.number))
+    no_deadline.sort(key=lambda r: r.number)
+
+    buf = io.StringIO()
+    buf.write(
+        f"# Roadmap Health Report ({today.isoformat()})\n"
+        "\n"
+        "Automatisch generierter Reminder fuer Roadmap-Issues.\n"
+        "\n"
+        "## Summary\n"
+        "\n"
+        f"- Open roadmap issues: **{len(issues)}**\n"
+        f"- Overdue: **{len(overdue)}**\n"
+        f"- Upcoming (naechste {upcoming_days} Tage): **{len(upcoming)}**\n"
+        f"- Ohne Deadline: **{len(no_deadline)}**\n"
+        "\n"
+    )
     if warning:
-        lines.append(f"> Hinweis: {warning}")
-        lines.append("")
+        buf.write(f"> Hinweis: {warning}\n\n")
 
-    def section(name: str, rows: list[dict]) -> None:
-        lines.append(f"## {name}")
-        lines.append("")
+    def section(name: str, rows: list[ReportRow]) -> None:
+        buf.write(f"## {name}\n\n")
         if not rows:
-            lines.append("_Keine Eintraege._")
-            lines.append("")
+            buf.write("_Keine Eintraege._\n\n")
             return
-        lines.append("| Issue | Titel | Status | Prio | Window | Deadline | Quelle | Tage |")
-        lines.append("|---|---|---|---|---|---|---|---:|")
+        buf.write(REPORT_TABLE_HEADER)
+        write = buf.write
         for row in rows:
-            days = "-" if row["days_left"] is None else str(row["days_left"])
-            title = row["title"].replace("|", "/")
-            lines.append(
-                f"| [#{row['number']}]({row['url']}) | {title} | {row['status']} | {row['priority']} | "
-                f"{row['window']} | {row['deadline']} | {row['source']} | {days} |"
-            )
-        lines.append("")
+            write(REPORT_ROW(row, row.title.replace("|", "/"), "-" if row.days_left is None else row.days_left))
+        buf.write("\n")
 
     section("Overdue", overdue)
     section(f"Upcoming (<= {upcoming_days} Tage)", upcoming)
     section("Ohne Deadline", no_deadline)
     section("Alle Open Roadmap Issues", all_rows)
-    return "\n".join(lines).strip() + "\n"
-
-
-def ensure_label(repo: str, label: str) -> None:
-    run(
-        [
-            "gh",
-            "label",
-            "create",
-            label,
-            "--repo",
-            repo,
-            "--color",
-            "8a2be2",
-            "--description",
-            "Automatischer Roadmap Report",
-            "--force",
-        ]
+    return buf.getvalue().strip() + "\n"
+
+
+def ensure_labels(client: GitHubClient, repo: str, labels: list[str]) -> None:
+    """Create missing labels and reset color/description of the others, like `gh label create --force`.
+
+    One query reads all labels; only labels that are missing or differ cost a REST call.
+    """
+    if not labels:
+        return
+    owner, name = repo.split("/", 1)
+    params = "".join(f", $label{i}: String!" for i in range(len(labels)))
+    aliases = " ".join(f"l{i}: label(name: $label{i}) {{ color description }}" for i in range(len(labels)))
+    data = client.graphql(
+        f"query($owner: String!, $name: String!{params}) {{ repository(owner: $owner, name: $name) {{ {aliases} }} }}",
+        {"owner": owner, "name": name, **{f"label{i}": label for i, label in enumerate(labels)}},
     )
-
-
-def upsert_issue(repo: str, title: str, body_file: Path, labels: list[str]) -> str:
-    payload = run(
-        [
-            "gh",
-            "issue",
-            "list",
-            "--repo",
-            repo,
-            "--state",
-            "open",
-            "--search",
-            f'in:title "{title}"',
-            "--json",
-            "number,title,url",
-            "--limit",
-            "20",
-        ],
-        expect_json=True,
+    for i, label in enumerate(labels):
+        current = data["repository"][f"l{i}"]
+        if current is None:
+            client.request("POST", f"/repos/{repo}/labels", {"name": label, **REPORT_LABEL_FIELDS})
+        elif (current["color"].lower(), current["description"] or "") != tuple(REPORT_LABEL_FIELDS.values()):
+            client.request("PATCH", f"/repos/{repo}/labels/{path_segment(label)}", REPORT_LABEL_FIELDS)
+
+
+def upsert_issue(client: GitHubClient, repo: str, title: str, body_file: Path, labels: list[str]) -> str:
+    owner, name = repo.split("/", 1)
+    data = client.graphql(
+        FIND_REPORT_ISSUE_QUERY,
+        {
+            "search": f'repo:{repo} is:issue is:open in:title "{title}"',
+            "owner": owner,
+            "name": name,
+            "labels": labels[:1],
+            "byLabel": bool(labels),
+        },
     )
-    existing = next((item for item in payload if item.get("title") == title), None)
+    existing = next((item for item in data["byTitle"]["nodes"] if item.get("title") == title), None)
     if not existing and labels:
-        fallback = run(
-            [
-                "gh",
-                "issue",
-                "list",
-                "--repo",
-                repo,
-                "--state",
-                "open",
-                "--label",
-                labels[0],
-                "--json",
-                "number,title,url",
-                "--limit",
-                "20",
-            ],
-            expect_json=True,
-        )
+        fallback = data["repository"]["issues"]["nodes"]
         existing = next((item for item in fallback if str(item.get("title", "")).startswith("[Roadmap] Weekly")), None)
+    body = body_file.read_text(encoding="utf-8")
     if existing:
-        run(
-            [
-                "gh",
-                "issue",
-                "edit",
-                str(existing["number"]),
-                "--repo",
-                repo,
-                "--title",
-                title,
-                "--body-file",
-                str(body_file),
-            ]
-        )
-        for label in labels:
-            run(["gh", "issue", "edit", str(existing["number"]), "--repo", repo, "--add-label", label])
+        update = {"title": title, "body": body}
+        if labels:
+            # PATCH replaces the label set, so keep the ones the issue already has.
+            current = [label["name"] for label in existing["labels"]["nodes"]]
+            update["labels"] = current + [label for label in labels if label not in current]
+        client.request("PATCH", f"/repos/{repo}/issues/{existing['number']}", update)
         return existing["url"]
 
-    cmd = [
-        "gh",
-        "issue",
-        "create",
-        "--repo",
-        repo,
-        "--title",
-        title,
-        "--body-file",
-        str(body_file),
-    ]
-    for label in labels:
-        cmd.extend(["--label", label])
-    url = run(cmd)
-    return str(url)
+    created = client.request("POST", f"/repos/{repo}/issues", {"title": title, "body": body, "labels": labels})
+    return str(created["html_url"])
 
 
 def main() -> int:
@@ -291,13 +321,24 @@ def main() -> int:
     parser.add_argument("--labels", default="roadmap-report,roadmap,ops", help="Comma-separated labels for report issue")
     parser.add_argument("--output-file", type=Path, default=Path("roadmap-health-report.md"))
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--cache-ttl", type=int, default=DEFAULT_CACHE_TTL_SECONDS, help="Seconds to reuse cached reads in dry-run mode"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch fresh issue and project data")
     args = parser.parse_args()
 
-    issues = fetch_open_roadmap_issues(args.repo)
-    project_meta, warning = fetch_project_metadata(
-        project_number=args.project_number if args.project_number > 0 else None,
-        project_owner=args.project_owner or None,
-    )
+    # Only dry-runs reuse cached reads; a published report is always built from live data.
+    client = GitHubClient(cache_ttl=0 if args.no_cache or not args.dry_run else args.cache_ttl)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        issues_future = executor.submit(fetch_open_roadmap_issues, client, args.repo)
+        meta_future = executor.submit(
+            fetch_project_metadata,
+            client,
+            project_number=args.project_number if args.project_number > 0 else None,
+            project_owner=args.project_owner or None,
+        )
+        issues = issues_future.result()
+        project_meta, warning = meta_future.result()
     report = build_report(issues, project_meta, warning, args.days_upcoming)
     args.output_file.write_text(report, encoding="utf-8")
     print(f"Report written to {args.output_file}")
@@ -308,9 +349,8 @@ def main() -> int:
         return 0
 
     labels = [it.strip() for it in args.labels.split(",") if it.strip()]
-    for label in labels:
-        ensure_label(args.repo, label)
-    issue_url = upsert_issue(args.repo, args.upsert_issue_title, args.output_file, labels)
+    ensure_labels(client, args.repo, labels)
+    issue_url = upsert_issue(client, args.repo, args.upsert_issue_title, args.output_file, labels)
     print(f"Report issue upserted: {issue_url}")
     return 0
 
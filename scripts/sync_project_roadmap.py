@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""Sync roadmap CSV entries into a GitHub Project (v2) via gh CLI.
+"""Sync roadmap CSV entries into a GitHub Project (v2) via the GitHub GraphQL API.
 
 Usage examples:
   python3 scripts/sync_project_roadmap.py --project 4 --owner @me --dry-run
@@ -11,51 +11,132 @@ from __future__ import annotations
 import argparse
 import csv
 import json
-import subprocess
+import re
 import sys
+from dataclasses import dataclass
 from pathlib import Path
 
+from github_api import (
+    DEFAULT_CACHE_TTL_SECONDS,
+    GitHubClient,
+    project_node,
+    project_query,
+    project_variables,
+)
+
 
 DEFAULT_CSV = Path("docs/PROJECT_ROADMAP_IMPORT.csv")
 DEFAULT_WINDOW_OPTIONS = ["Bereits umgesetzt", "0-30 Tage", "31-60 Tage", "61-90 Tage"]
 DEFAULT_PRIORITY_OPTIONS = ["P0", "P1", "P2", "P3"]
+# Everything str.isalnum() rejects (\w is alnum plus "_"); umlauts etc. are kept.
+NON_ALNUM_RE = re.compile(r"[\W_]+")
+# RoadmapRow field order.
+CSV_COLUMNS = ("Title", "Body", "Status", "Iteration", "Labels", "Priority")
+
+FIELDS_SELECTION = """
+    id
+    fields(first: 100) {
+      nodes {
+        ... on ProjectV2FieldCommon { id name }
+        ... on ProjectV2SingleSelectField { options { id name } }
+      }
+    }
+"""
+ITEMS_SELECTION = """
+    items(first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        id
+        content {
+          __typename
+          ... on DraftIssue { id title }
+          ... on Issue { id title }
+          ... on PullRequest { id title }
+        }
+      }
+    }
+"""
+CREATE_FIELD_MUTATION = """
+mutation($project: ID!, $name: String!, $options: [ProjectV2SingleSelectFieldOptionInput!]) {
+  createProjectV2Field(
+    input: {projectId: $project, dataType: SINGLE_SELECT, name: $name, singleSelectOptions: $options}
+  ) { projectV2Field { ... on ProjectV2SingleSelectField { id name options { id name } } } }
+}
+"""
+# Single-select updates go out as aliased mutations, this many per request.
+FIELD_UPDATE_BATCH = 50
+# Draft creates/edits per aliased mutation; they carry full bodies, so fewer than field updates.
+DRAFT_MUTATION_BATCH = 20
 
 
 def normalize(value: str) -> str:
-    return "".join(ch for ch in value.lower().strip() if ch.isalnum())
-
-
-def run_gh(args: list[str], expect_json: bool = False) -> dict | list | str:
-    cmd = ["gh", *args]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    if proc.returncode != 0:
-        raise RuntimeError(f"gh command failed: {' '.join(cmd)}\n{proc.stderr.strip()}")
-    output = proc.stdout.strip()
-    if expect_json:
-        return json.loads(output or "{}")
-    return output
-
-
-def read_csv_rows(path: Path) -> list[dict]:
+    return NON_ALNUM_RE.sub("", value.lower())
+
+
+def fetch_project(client: GitHubClient, project: int, owner: str) -> tuple[str, list[dict]]:
+    data = client.graphql(project_query(owner, FIELDS_SELECTION), project_variables(owner, project))
+    node = project_node(data, owner, project)
+    fields = [field for field in node["fields"]["nodes"] if field.get("name")]
+    return node["id"], fields
+
+
+def fetch_items(client: GitHubClient, project: int, owner: str) -> list[dict]:
+    query = project_query(owner, ITEMS_SELECTION, "$cursor: String")
+    items = []
+    cursor = None
+    while True:
+        data = client.graphql(query, project_variables(owner, project, cursor=cursor))
+        page = project_node(data, owner, project)["items"]
+        for node in page["nodes"]:
+            content = node.get("content") or {}
+            items.append(
+                {
+                    "id": node["id"],
+                    "title": content.get("title"),
+                    "content": {"id": content.get("id", ""), "type": content.get("__typename")},
+                }
+            )
+        if not page["pageInfo"]["hasNextPage"]:
+            return items
+        cursor = page["pageInfo"]["endCursor"]
+
+
+@dataclass(frozen=True, slots=True)
+class RoadmapRow:
+    title: str
+    body: str
+    status: str
+    iteration: str
+    labels: str
+    priority: str
+
+
+def read_csv_rows(path: Path) -> list[RoadmapRow]:
     with path.open(newline="", encoding="utf-8") as handle:
-        return list(csv.DictReader(handle))
-
-
-def build_body(row: dict) -> str:
-    body = (row.get("Body") or "").strip()
-    iteration = (row.get("Iteration") or "").strip()
-    priority = (row.get("Priority") or "").strip()
-    labels = (row.get("Labels") or "").strip()
+        reader = csv.reader(handle)
+        header = next(reader, [])
+        columns = [header.index(name) if name in header else None for name in CSV_COLUMNS]
+        rows = []
+        for record in reader:
+            if not record:
+                continue
+            rows.append(
+                RoadmapRow(*((record[i] if i is not None and i < len(record) else "").strip() for i in columns))
+            )
+        return rows
+
+
+def build_body(row: RoadmapRow) -> str:
     meta = []
-    if iteration:
-        meta.append(f"- Iteration: {iteration}")
-    if priority:
-        meta.append(f"- Priority: {priority}")
-    if labels:
-        meta.append(f"- Labels: {labels}")
+    if row.iteration:
+        meta.append(f"- Iteration: {row.iteration}")
+    if row.priority:
+        meta.append(f"- Priority: {row.priority}")
+    if row.labels:
+        meta.append(f"- Labels: {row.labels}")
     if meta:
-        return f"{body}\n\n---\nRoadmap-Metadaten:\n" + "\n".join(meta)
-    return body
+        return f"{row.body}\n\n---\nRoadmap-Metadaten:\n" + "\n".join(meta)
+    return row.body
 
 
 def find_field(fields: list[dict], name: str) -> dict | None:
@@ -65,21 +146,25 @@ def find_field(fields: list[dict], name: str) -> dict | None:
     return None
 
 
+def option_index(field: dict) -> dict[str, str]:
+    """Normalized option name -> option id; the first matching option wins, as an in-order scan would."""
+    index = {}
+    for option in field.get("options") or []:
+        index.setdefault(normalize(option.get("name", "")), option.get("id"))
+    return index
+
+
 def option_id_for(field: dict, wanted: str) -> str | None:
-    options = field.get("options") or []
-    if not options:
-        return None
-    wanted_norm = normalize(wanted)
-    for option in options:
-        name = option.get("name", "")
-        if name == wanted or normalize(name) == wanted_norm:
-            return option.get("id")
-    return None
+    index = field.get("option_index")
+    if index is None:
+        # Built on first use and kept on the field, so each option name is normalized once per run.
+        index = field["option_index"] = option_index(field)
+    return index.get(normalize(wanted))
 
 
 def ensure_single_select_field(
-    project: int,
-    owner: str,
+    client: GitHubClient,
+    project_id: str,
     fields: list[dict],
     field_name: str,
     options: list[str],
@@ -94,53 +179,87 @@ def ensure_single_select_field(
     if dry_run:
         print(f"[dry-run] would create field '{field_name}' with options {options}")
         return {"id": f"DRYRUN_{field_name}", "name": field_name, "options": [{"id": opt, "name": opt} for opt in options]}
-    run_gh(
-        [
-            "project",
-            "field-create",
-            str(project),
-            "--owner",
-            owner,
-            "--name",
-            field_name,
-            "--data-type",
-            "SINGLE_SELECT",
-            "--single-select-options",
-            ",".join(options),
-        ]
+    created = client.graphql(
+        CREATE_FIELD_MUTATION,
+        {
+            "project": project_id,
+            "name": field_name,
+            "options": [{"name": opt, "color": "GRAY", "description": ""} for opt in options],
+        },
     )
-    refreshed = run_gh(["project", "field-list", str(project), "--owner", owner, "--format", "json"], expect_json=True)
-    return find_field(refreshed.get("fields", []), field_name)
+    # The mutation returns the new field with its option ids, so there is no need to list the fields again.
+    field = created["createProjectV2Field"]["projectV2Field"]
+    fields.append(field)
+    return field
 
 
 def set_single_select(
     item_id: str,
-    project_id: str,
     field: dict,
     value: str,
     dry_run: bool,
-) -> None:
+) -> tuple[str, str] | None:
+    """Resolve a single-select update to (field_id, option_id); None if there is nothing to send."""
     option_id = option_id_for(field, value)
     if not option_id:
         print(f"[warn] option '{value}' not found in field '{field.get('name')}'")
-        return
+        return None
     if dry_run:
         print(f"[dry-run] set {field.get('name')}={value} for item {item_id}")
-        return
-    run_gh(
-        [
-            "project",
-            "item-edit",
-            "--id",
-            item_id,
-            "--project-id",
-            project_id,
-            "--field-id",
-            field["id"],
-            "--single-select-option-id",
-            option_id,
-        ]
-    )
+        return None
+    return field["id"], option_id
+
+
+def apply_field_updates(client: GitHubClient, project_id: str, updates: list[tuple[str, str, str]]) -> None:
+    """Send (item_id, field_id, option_id) updates as one aliased GraphQL mutation per batch."""
+    for start in range(0, len(updates), FIELD_UPDATE_BATCH):
+        params = ["$project: ID!"]
+        fields = []
+        variables = {"project": project_id}
+        for i, (item_id, field_id, option_id) in enumerate(updates[start : start + FIELD_UPDATE_BATCH]):
+            params.append(f"$item{i}: ID!, $field{i}: ID!, $option{i}: String!")
+            fields.append(
+                f"u{i}: updateProjectV2ItemFieldValue(input: {{projectId: $project, itemId: $item{i}, "
+                f"fieldId: $field{i}, value: {{singleSelectOptionId: $option{i}}}}}) {{ clientMutationId }}"
+            )
+            variables.update({f"item{i}": item_id, f"field{i}": field_id, f"option{i}": option_id})
+        client.graphql(f"mutation({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}", variables)
+
+
+def create_draft_items(client: GitHubClient, project_id: str, drafts: list[tuple[str, str]]) -> list[str]:
+    """Create (title, body) drafts with one aliased mutation per batch; returns the item ids in order."""
+    item_ids = []
+    for start in range(0, len(drafts), DRAFT_MUTATION_BATCH):
+        chunk = drafts[start : start + DRAFT_MUTATION_BATCH]
+        params = ["$project: ID!"]
+        fields = []
+        variables = {"project": project_id}
+        for i, (title, body) in enumerate(chunk):
+            params.append(f"$title{i}: String!, $body{i}: String")
+            fields.append(
+                f"a{i}: addProjectV2DraftIssue(input: {{projectId: $project, title: $title{i}, body: $body{i}}}) "
+                "{ projectItem { id } }"
+            )
+            variables.update({f"title{i}": title, f"body{i}": body})
+        data = client.graphql(f"mutation({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}", variables)
+        item_ids.extend(data[f"a{i}"]["projectItem"]["id"] for i in range(len(chunk)))
+    return item_ids
+
+
+def update_draft_items(client: GitHubClient, edits: list[tuple[str, str, str]]) -> None:
+    """Send (draft_id, title, body) text updates as one aliased mutation per batch."""
+    for start in range(0, len(edits), DRAFT_MUTATION_BATCH):
+        params = []
+        fields = []
+        variables = {}
+        for i, (draft_id, title, body) in enumerate(edits[start : start + DRAFT_MUTATION_BATCH]):
+            params.append(f"$draft{i}: ID!, $title{i}: String!, $body{i}: String")
+            fields.append(
+                f"e{i}: updateProjectV2DraftIssue(input: {{draftIssueId: $draft{i}, title: $title{i}, "
+                f"body: $body{i}}}) {{ draftIssue {{ id }} }}"
+            )
+            variables.update({f"draft{i}": draft_id, f"title{i}": title, f"body{i}": body})
+        client.graphql(f"mutation({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}", variables)
 
 
 def main() -> int:
@@ -154,6 +273,10 @@ def main() -> int:
     parser.add_argument("--status-field", default="Status")
     parser.add_argument("--window-field", default="Roadmap Window")
     parser.add_argument("--priority-field", default="Priority")
+    parser.add_argument(
+        "--cache-ttl", type=int, default=DEFAULT_CACHE_TTL_SECONDS, help="Seconds to reuse cached reads in dry-run mode"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch fresh project data")
     args = parser.parse_args()
 
     dry_run = args.dry_run or not args.apply
@@ -162,25 +285,17 @@ def main() -> int:
         print("No rows found in CSV.")
         return 0
 
-    project_view = run_gh(
-        ["project", "view", str(args.project), "--owner", args.owner, "--format", "json"],
-        expect_json=True,
-    )
-    project_id = project_view["id"]
-
-    fields_raw = run_gh(
-        ["project", "field-list", str(args.project), "--owner", args.owner, "--format", "json"],
-        expect_json=True,
-    )
-    fields = fields_raw.get("fields", [])
+    # Only dry-runs reuse cached reads; --apply must decide on live project state.
+    client = GitHubClient(cache_ttl=0 if args.no_cache or not dry_run else args.cache_ttl)
+    project_id, fields = fetch_project(client, args.project, args.owner)
 
     status_field = find_field(fields, args.status_field)
     if not status_field:
         raise RuntimeError(f"Required field '{args.status_field}' not found in project.")
 
     window_field = ensure_single_select_field(
-        project=args.project,
-        owner=args.owner,
+        client,
+        project_id=project_id,
         fields=fields,
         field_name=args.window_field,
         options=DEFAULT_WINDOW_OPTIONS,
@@ -188,8 +303,8 @@ def main() -> int:
         dry_run=dry_run,
     )
     priority_field = ensure_single_select_field(
-        project=args.project,
-        owner=args.owner,
+        client,
+        project_id=project_id,
         fields=fields,
         field_name=args.priority_field,
         options=DEFAULT_PRIORITY_OPTIONS,
@@ -197,52 +312,35 @@ def main() -> int:
         dry_run=dry_run,
     )
 
-    items_raw = run_gh(
-        ["project", "item-list", str(args.project), "--owner", args.owner, "--format", "json"],
-        expect_json=True,
-    )
-    items = items_raw.get("items", [])
+    items = fetch_items(client, args.project, args.owner)
     by_title = {item.get("title"): item for item in items if item.get("title")}
 
     created = 0
     updated = 0
-
+    drafts: list[tuple[str, str]] = []
+    new_items: list[dict] = []
+    draft_edits: list[tuple[str, str, str]] = []
+    # (item, row) pairs; items created in this run get their id once the create batch has returned.
+    field_rows: list[tuple[dict, RoadmapRow]] = []
     for row in rows:
-        title = (row.get("Title") or "").strip()
+        title = row.title
         if not title:
             continue
         body = build_body(row)
-        status_value = (row.get("Status") or "Todo").strip() or "Todo"
-        window_value = (row.get("Iteration") or "").strip()
-        priority_value = (row.get("Priority") or "").strip()
 
         existing = by_title.get(title)
         if not existing:
             if dry_run:
                 print(f"[dry-run] create item: {title}")
-                item_id = f"DRYRUN_{normalize(title)[:16]}"
+                item = {"id": f"DRYRUN_{normalize(title)[:16]}", "title": title}
             else:
-                created_item = run_gh(
-                    [
-                        "project",
-                        "item-create",
-                        str(args.project),
-                        "--owner",
-                        args.owner,
-                        "--title",
-                        title,
-                        "--body",
-                        body,
-                        "--format",
-                        "json",
-                    ],
-                    expect_json=True,
-                )
-                item_id = created_item["id"]
-                by_title[title] = {"id": item_id, "title": title}
+                item = {"id": None, "title": title}
+                drafts.append((title, body))
+                new_items.append(item)
+                by_title[title] = item
             created += 1
         else:
-            item_id = existing["id"]
+            item = existing
             if dry_run:
                 print(f"[dry-run] update draft item: {title}")
             else:
@@ -250,27 +348,28 @@ def main() -> int:
                 content = existing.get("content") or {}
                 content_id = content.get("id", "")
                 if content_id.startswith("DI_"):
-                    run_gh(
-                        [
-                            "project",
-                            "item-edit",
-                            "--id",
-                            content_id,
-                            "--title",
-                            title,
-                            "--body",
-                            body,
-                        ]
-                    )
+                    draft_edits.append((content_id, title, body))
                 else:
                     print(f"[warn] skip body update for non-draft item '{title}'")
             updated += 1
-
-        set_single_select(item_id, project_id, status_field, status_value, dry_run=dry_run)
-        if window_field and window_value:
-            set_single_select(item_id, project_id, window_field, window_value, dry_run=dry_run)
-        if priority_field and priority_value:
-            set_single_select(item_id, project_id, priority_field, priority_value, dry_run=dry_run)
+        field_rows.append((item, row))
+
+    for item, item_id in zip(new_items, create_draft_items(client, project_id, drafts)):
+        item["id"] = item_id
+    update_draft_items(client, draft_edits)
+
+    field_updates: list[tuple[str, str, str]] = []
+    for item, row in field_rows:
+        selects = [(status_field, row.status or "Todo")]
+        if window_field and row.iteration:
+            selects.append((window_field, row.iteration))
+        if priority_field and row.priority:
+            selects.append((priority_field, row.priority))
+        for field, value in selects:
+            update = set_single_select(item["id"], field, value, dry_run=dry_run)
+            if update:
+                field_updates.append((item["id"], *update))
+    apply_field_updates(client, project_id, field_updates)
 
     summary = {
         "project": args.project,